@@ -6,70 +6,472 @@ Processes images with Google Gemini Pro Vision to generate product descriptions
 
 import os
 import argparse
-import base64
+import asyncio
+import atexit
+import datetime
+import hashlib
+import io
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Optional
 import json
 
 # Import prompt template
-from prompts import get_enhanced_prompt
+from prompts import get_enhanced_prompt, STATIC_PREFIX, SKU_FIELDS, dynamic_suffix
 
 # Google Gemini imports
 try:
     import google.generativeai as genai
-    from PIL import Image
+    from google.generativeai import client as genai_client
+    from PIL import Image, ImageOps
 except ImportError:
     genai = None
+    genai_client = None
     Image = None
+    ImageOps = None
+
+# Optional fast JSON backend (falls back to the stdlib json module)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional perceptual hashing for the near-duplicate response cache
+try:
+    import imagehash
+except ImportError:
+    imagehash = None
+
+MODEL_NAME = 'gemini-2.5-flash'
+
+# Characters stripped from SKU parts: anything but str.isalnum() characters and '-'
+SKU_CLEAN_PATTERN = re.compile(r'[^\w-]|_')
+
+# Shared decoder for pulling the JSON object out of model responses
+JSON_DECODER = json.JSONDecoder()
+
+# Fields the default prompt asks for, and those whose value must be a list
+SKU_FIELD_NAMES = frozenset(SKU_FIELDS)
+SKU_LIST_FIELDS = frozenset(name for name, hint in SKU_FIELDS.items() if isinstance(hint, list))
+
+# Image file extensions picked up from SKU folders
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp')
+
+# Response cache defaults
+DEFAULT_CACHE_PATH = os.path.expanduser("~/.cache/sku_gen.db")
+CACHE_TTL_SECONDS = 7 * 24 * 60 * 60  # 7 days
+
+# Near-duplicate matching: max differing perceptual-hash bits per image (of 64)
+SIMILARITY_MAX_DISTANCE = 8
+
+# Images are downscaled to fit this box before upload (the model downsizes anyway)
+MAX_IMAGE_SIZE = (1024, 1024)
+
+# Formats Gemini accepts as inline bytes (other formats go through PIL)
+RAW_UPLOAD_MIME_TYPES = {'JPEG': 'image/jpeg', 'PNG': 'image/png', 'WEBP': 'image/webp'}
+
+# Upper bound on threads used to load images
+MAX_IMAGE_LOAD_WORKERS = 8
+
+# Maximum concurrent Gemini requests in batch mode
+MAX_BATCH_CONCURRENCY = 8
+
+# Lifetime of the Gemini-side cached prompt prefix
+CONTEXT_CACHE_TTL = datetime.timedelta(hours=1)
+# Recreate the context cache this many seconds before it expires, so in-flight requests never hit a dead cache
+CONTEXT_CACHE_REFRESH_MARGIN = 5 * 60
+
+# genai.configure() sets process-wide defaults; held while a generator binds clients for its own key
+_GENAI_CONFIG_LOCK = threading.Lock()
+
+
+def dump_json_bytes(data) -> bytes:
+    """Serialize data as indented UTF-8 JSON, using orjson when available"""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+class ResponseCache:
+    """Exact-match SQLite cache for Gemini responses"""
+
+    def __init__(self, db_path: str = DEFAULT_CACHE_PATH, ttl: int = CACHE_TTL_SECONDS):
+        self.db_path = db_path
+        self.ttl = ttl
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT, ts INTEGER)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS signatures (key TEXT PRIMARY KEY, prompt_hash TEXT, hashes TEXT, ts INTEGER)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(prompt: str, image_data: List[Optional[bytes]], model_name: str) -> str:
+        """Build a stable key from the prompt, raw image bytes and model name"""
+        parts = [model_name, hashlib.blake2b(prompt.encode('utf-8')).hexdigest()]
+        for data in image_data:
+            parts.append(hashlib.blake2b(data).hexdigest() if data is not None else "missing")
+        return hashlib.blake2b("|".join(parts).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def make_prompt_hash(prompt: str, model_name: str) -> str:
+        """Hash of the model name and prompt, used to scope near-duplicate matches"""
+        return hashlib.blake2b(f"{model_name}|{prompt}".encode('utf-8')).hexdigest()
+
+    def find_similar(self, prompt_hash: str, hashes: List[int],
+                     max_distance: int = SIMILARITY_MAX_DISTANCE) -> Optional[str]:
+        """Return the response of the closest cached image set within max_distance bits per image"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, hashes FROM signatures WHERE prompt_hash = ? AND ts >= ?",
+                (prompt_hash, int(time.time() - self.ttl))
+            ).fetchall()
+        
+        best_key, best_distance = None, None
+        for key, stored in rows:
+            stored_hashes = [int(h, 16) for h in stored.split(',')]
+            if len(stored_hashes) != len(hashes):
+                continue
+            distances = [bin(a ^ b).count('1') for a, b in zip(hashes, stored_hashes)]
+            if max(distances) > max_distance:
+                continue
+            total = sum(distances)
+            if best_distance is None or total < best_distance:
+                best_key, best_distance = key, total
+        
+        return self.get(best_key) if best_key else None
+
+    def set_signature(self, key: str, prompt_hash: str, hashes: List[int]):
+        """Store the perceptual hashes of the image set cached under key"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO signatures (key, prompt_hash, hashes, ts) VALUES (?, ?, ?, ?)",
+                (key, prompt_hash, ",".join(f"{h:016x}" for h in hashes), int(time.time()))
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response text, or None if missing or expired"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, ts FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            response, ts = row
+            if time.time() - ts > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            return response
+
+    def set(self, key: str, response: str):
+        """Store a response text under the given key"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, ts) VALUES (?, ?, ?)",
+                (key, response, int(time.time()))
+            )
+            self._conn.commit()
 
 
 class SKUGenerator:
-    def __init__(self, model_type: str, api_key: str):
+    def __init__(self, model_type: str, api_key: str, cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+                 context_cache: bool = False, similarity_cache: bool = False):
         self.model_type = model_type.lower()
         self.api_key = api_key
         
         if self.model_type == "gemini":
             if not genai or not Image:
                 raise ImportError("Google Generative AI and PIL libraries not installed. Run: pip install google-generativeai pillow")
-            genai.configure(api_key=api_key)
         else:
             raise ValueError("Model type must be 'gemini'")
 
+        # Construct the model once and reuse it for every request
+        self._model = genai.GenerativeModel(MODEL_NAME)
+
+        # Response cache (pass cache_path=None to disable)
+        self.cache = None
+        if cache_path:
+            try:
+                self.cache = ResponseCache(cache_path)
+            except Exception as e:
+                print(f"Warning: Response cache disabled: {e}")
+
+        # Near-duplicate matching is opt-in: a hit reuses another item's condition details
+        self.similarity_cache = bool(similarity_cache and self.cache)
+        if self.similarity_cache and not imagehash:
+            print("Warning: imagehash not installed, near-duplicate cache disabled. Run: pip install imagehash")
+            self.similarity_cache = False
+
+        # Gemini context cache for the static prompt prefix (opt-in: the API
+        # rejects prefixes below the model's minimum cacheable token count)
+        self._cache = None
+        self._cached_model = None
+        self._cache_expires_at = 0.0
+        self._context_cache_lock = threading.Lock()
+        if context_cache and self._create_context_cache():
+            # Don't leave the cache billing storage until its TTL runs out
+            atexit.register(self.close)
+
+    def close(self):
+        """Delete the Gemini context cache, if one was created"""
+        cache, self._cache, self._cached_model = self._cache, None, None
+        if cache is None:
+            return
+        try:
+            with _GENAI_CONFIG_LOCK:
+                genai.configure(api_key=self.api_key)
+                cache.delete()
+        except Exception as e:
+            print(f"Warning: Could not delete Gemini context cache: {e}")
+
+    def _create_context_cache(self) -> bool:
+        """Cache the static prompt prefix on Gemini's side; False (full prompts are sent) if unavailable"""
+        try:
+            with _GENAI_CONFIG_LOCK:
+                genai.configure(api_key=self.api_key)
+                cache = genai.caching.CachedContent.create(
+                    model=f"models/{MODEL_NAME}",
+                    contents=[STATIC_PREFIX],
+                    ttl=CONTEXT_CACHE_TTL
+                )
+            self._cached_model = genai.GenerativeModel.from_cached_content(cache)
+            self._cache = cache
+            self._cache_expires_at = (time.monotonic() + CONTEXT_CACHE_TTL.total_seconds()
+                                      - CONTEXT_CACHE_REFRESH_MARGIN)
+            return True
+        except Exception as e:
+            print(f"Warning: Gemini context caching unavailable, sending full prompt: {e}")
+            self._cache = self._cached_model = None
+            return False
+
+    def _get_cached_model(self):
+        """Model backed by a live context cache (recreated shortly before expiry), or None"""
+        if self._cached_model is not None and time.monotonic() >= self._cache_expires_at:
+            with self._context_cache_lock:
+                if self._cached_model is not None and time.monotonic() >= self._cache_expires_at:
+                    # The old cache is left to expire on its own: requests may still be using it
+                    self._create_context_cache()
+        return self._cached_model
+
     def process_with_gemini_enhanced(self, image_paths: List[str], reference_number: str, 
-                                   chinese_context: str = "", custom_prompt: str = None) -> dict:
+                                   chinese_context: str = "", custom_prompt: str = None,
+                                   image_data: Optional[List[bytes]] = None) -> dict:
         """Process images with Google Gemini Pro Vision with enhanced Chinese context"""
-        # Load images
+        # Read raw bytes once; they feed both the cache key and the upload.
+        # Callers holding the bytes in memory pass image_data (paths then only label warnings).
+        if image_data is None:
+            image_data = self._read_image_files(image_paths)
+        
+        cache_key, cached_text, signature = self._lookup_cache(image_data, chinese_context, custom_prompt)
+        if cached_text is not None:
+            return self._parse_response(cached_text, reference_number, custom_prompt is None)
+
+        # Prepare images in parallel (order is preserved by map)
         images = []
-        for img_path in image_paths:  # Limit to 5 images
+        if image_paths:
+            with ThreadPoolExecutor(max_workers=min(MAX_IMAGE_LOAD_WORKERS, len(image_paths))) as executor:
+                images = list(executor.map(self._load_image, image_paths, image_data))
+
+        model, contents = self._build_request(images, chinese_context, custom_prompt)
+        response = self._bind_client(model).generate_content(contents)
+        return self._finish_response(response.text, reference_number, cache_key, signature,
+                                     custom_prompt is None)
+
+    async def process_with_gemini_enhanced_async(self, image_paths: List[str], reference_number: str,
+                                                 chinese_context: str = "", custom_prompt: str = None) -> dict:
+        """Async variant of process_with_gemini_enhanced (file reads and decodes overlap in worker threads)"""
+        image_data = await asyncio.gather(
+            *(asyncio.to_thread(self._read_image_file, p) for p in image_paths))
+        
+        cache_key, cached_text, signature = await asyncio.to_thread(
+            self._lookup_cache, image_data, chinese_context, custom_prompt)
+        if cached_text is not None:
+            return self._parse_response(cached_text, reference_number, custom_prompt is None)
+
+        images = await asyncio.gather(
+            *(asyncio.to_thread(self._load_image, p, d) for p, d in zip(image_paths, image_data)))
+
+        model, contents = self._build_request(images, chinese_context, custom_prompt)
+        response = await self._bind_client(model, use_async=True).generate_content_async(contents)
+        return self._finish_response(response.text, reference_number, cache_key, signature,
+                                     custom_prompt is None)
+
+    def _bind_client(self, model, use_async: bool = False):
+        """Pin the model to an API client for this generator's key (first use only)"""
+        # Models otherwise pick up whichever key was configured last, e.g. by another Streamlit session
+        attr = '_async_client' if use_async else '_client'
+        if getattr(model, attr) is None:
+            with _GENAI_CONFIG_LOCK:
+                genai.configure(api_key=self.api_key)
+                if use_async:
+                    setattr(model, attr, genai_client.get_default_generative_async_client())
+                else:
+                    setattr(model, attr, genai_client.get_default_generative_client())
+        return model
+
+    def _lookup_cache(self, image_data: List[Optional[bytes]], chinese_context: str,
+                      custom_prompt: Optional[str]):
+        """Return (cache_key, cached_text, signature); values are None when unused or missing"""
+        if not self.cache:
+            return None, None, None
+
+        # Use custom prompt or enhanced default
+        prompt = custom_prompt or get_enhanced_prompt(chinese_context)
+        try:
+            cache_key = ResponseCache.make_key(prompt, image_data, MODEL_NAME)
+            cached_text = self.cache.get(cache_key)
+            if cached_text is not None:
+                print("Using cached Gemini response")
+                return cache_key, cached_text, None
+        except Exception as e:
+            print(f"Warning: Response cache lookup failed: {e}")
+            return None, None, None
+
+        # Fall back to a near-duplicate match on perceptual hashes
+        signature = None
+        if self.similarity_cache:
             try:
-                img = Image.open(img_path)
-                images.append(img)
+                hashes = [self._perceptual_hash(data) for data in image_data if data is not None]
+                if hashes:
+                    prompt_hash = ResponseCache.make_prompt_hash(prompt, MODEL_NAME)
+                    signature = (prompt_hash, hashes)
+                    cached_text = self.cache.find_similar(prompt_hash, hashes)
+                    if cached_text is not None:
+                        print("Using cached Gemini response from a near-duplicate image set")
+                        return cache_key, cached_text, signature
             except Exception as e:
-                print(f"Warning: Could not process image {img_path}: {e}")
-                continue
+                print(f"Warning: Near-duplicate cache lookup failed: {e}")
+                signature = None
+
+        return cache_key, None, signature
+
+    @staticmethod
+    def _perceptual_hash(data: bytes) -> int:
+        """64-bit perceptual hash of an image (decoded at reduced scale)"""
+        img = Image.open(io.BytesIO(data))
+        img.draft('L', (64, 64))
+        return int(str(imagehash.phash(img)), 16)
+
+    def _build_request(self, images: list, chinese_context: str, custom_prompt: Optional[str]):
+        """Return (model, contents) ready for generate_content, skipping unreadable images"""
+        images = [img for img in images if img is not None]
+
+        # Only the dynamic suffix is sent when the prefix is cached
+        cached_model = None if custom_prompt else self._get_cached_model()
+        if cached_model:
+            return cached_model, [dynamic_suffix(chinese_context)] + images
 
         # Use custom prompt or enhanced default
-        if custom_prompt:
-            prompt = custom_prompt
-        else:
-            prompt = get_enhanced_prompt(chinese_context)
+        prompt = custom_prompt or get_enhanced_prompt(chinese_context)
+        return self._model, [prompt] + images
 
-        # Generate content
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content([prompt] + images)
-        
+    def _finish_response(self, response_text: str, reference_number: str,
+                         cache_key: Optional[str], signature=None, check_schema: bool = True) -> dict:
+        """Parse a fresh response and store it in the cache if it parsed cleanly"""
+        result = self._parse_response(response_text, reference_number, check_schema)
+
+        if cache_key and "error" not in result:
+            try:
+                self.cache.set(cache_key, response_text)
+                if signature:
+                    self.cache.set_signature(cache_key, *signature)
+            except Exception as e:
+                print(f"Warning: Could not write response cache: {e}")
+
+        return result
+
+    @staticmethod
+    def _read_image_file(img_path: str) -> Optional[bytes]:
+        """Read an image file's raw bytes, returning None if it cannot be read"""
+        try:
+            # Unbuffered: readall() sizes the read from fstat, skipping the BufferedReader copy
+            with open(img_path, 'rb', buffering=0) as f:
+                return f.readall()
+        except Exception as e:
+            print(f"Warning: Could not read image {img_path}: {e}")
+            return None
+
+    def _read_image_files(self, image_paths: List[str]) -> List[Optional[bytes]]:
+        """Read raw bytes for all images in parallel, preserving order"""
+        if not image_paths:
+            return []
+        with ThreadPoolExecutor(max_workers=min(MAX_IMAGE_LOAD_WORKERS, len(image_paths))) as executor:
+            return list(executor.map(self._read_image_file, image_paths))
+
+    @staticmethod
+    def _load_image(img_path: str, data: Optional[bytes]):
+        """Prepare one image's bytes for upload, returning None if it cannot be used"""
+        if data is None:
+            return None
+        try:
+            # Image.open only parses the header here, no pixels are decoded yet
+            img = Image.open(io.BytesIO(data))
+            mime_type = RAW_UPLOAD_MIME_TYPES.get(img.format)
+            if mime_type and img.width <= MAX_IMAGE_SIZE[0] and img.height <= MAX_IMAGE_SIZE[1]:
+                # Already small and in a supported format: send the original bytes
+                return {'mime_type': mime_type, 'data': data}
+            
+            # EXIF orientation comes from the header; the re-encoded upload loses it
+            orientation = img.getexif().get(0x0112, 1)
+            
+            # JPEG fast path: decode at reduced scale, then resize to the target box
+            img.draft('RGB', MAX_IMAGE_SIZE)
+            img.thumbnail(MAX_IMAGE_SIZE, Image.Resampling.LANCZOS)
+            
+            # Rotate only the downscaled pixels, and only when actually needed
+            if orientation != 1:
+                img = ImageOps.exif_transpose(img)
+            return img
+        except Exception as e:
+            print(f"Warning: Could not process image {img_path}: {e}")
+            return None
+
+    @staticmethod
+    def _check_schema(parsed_json: dict):
+        """Check a response against the prompt's fields, wrapping list fields returned as plain strings"""
+        missing = SKU_FIELD_NAMES.difference(parsed_json)
+        if missing:
+            print(f"Warning: Response is missing fields: {', '.join(sorted(missing))}")
+        for name in SKU_LIST_FIELDS.intersection(parsed_json):
+            value = parsed_json[name]
+            if isinstance(value, str):
+                parsed_json[name] = [value] if value else []
+
+    def _parse_response(self, raw_text: str, reference_number: str, check_schema: bool = True) -> dict:
+        """Parse the Gemini response text into a product JSON with reference number and SKU"""
         # Try to parse JSON response
         try:
             # Clean the response text to extract JSON
-            response_text = response.text.strip()
+            response_text = raw_text.strip()
             
-            # Find JSON content (remove any text before or after JSON)
+            # Decode the first JSON object in place (ignores any text before or after it)
             start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
             
-            if start_idx != -1 and end_idx != 0:
-                json_text = response_text[start_idx:end_idx]
-                parsed_json = json.loads(json_text)
+            if start_idx != -1:
+                parsed_json = None
+                if orjson and response_text.endswith('}'):
+                    # Fast path: the response is a bare JSON object
+                    try:
+                        parsed_json = orjson.loads(response_text[start_idx:])
+                    except orjson.JSONDecodeError:
+                        parsed_json = None
+                if parsed_json is None:
+                    parsed_json, _ = JSON_DECODER.raw_decode(response_text, start_idx)
+                
+                if not isinstance(parsed_json, dict):
+                    raise ValueError("Response JSON is not an object")
+                if check_schema:
+                    self._check_schema(parsed_json)
                 
                 # Add reference number to the JSON
                 parsed_json["reference_number"] = reference_number
@@ -85,11 +487,11 @@ class SKUGenerator:
         
         except json.JSONDecodeError as e:
             print(f"Warning: Failed to parse JSON response: {e}")
-            print(f"Raw response: {response.text}")
+            print(f"Raw response: {raw_text}")
             # Return a structured error response
             return {
                 "error": "Failed to parse JSON response",
-                "raw_response": response.text,
+                "raw_response": raw_text,
                 "reference_number": reference_number,
                 "sku": f"error-error-error-error-error-{reference_number}".lower()
             }
@@ -112,11 +514,11 @@ class SKUGenerator:
             sub_category = json_data.get("sub_category", "unknown").lower().replace(" ", "-")
             
             # Clean up values (remove special characters, normalize)
-            color = "".join(c for c in color if c.isalnum() or c == "-")
-            material = "".join(c for c in material if c.isalnum() or c == "-")
-            model = "".join(c for c in model if c.isalnum() or c == "-")
-            brand = "".join(c for c in brand if c.isalnum() or c == "-")
-            sub_category = "".join(c for c in sub_category if c.isalnum() or c == "-")
+            color = SKU_CLEAN_PATTERN.sub("", color)
+            material = SKU_CLEAN_PATTERN.sub("", material)
+            model = SKU_CLEAN_PATTERN.sub("", model)
+            brand = SKU_CLEAN_PATTERN.sub("", brand)
+            sub_category = SKU_CLEAN_PATTERN.sub("", sub_category)
             
             # Generate SKU in the specified format
             sku = f"{color}-{material}-{model}-{brand}-{sub_category}-{reference_number}"
@@ -128,26 +530,47 @@ class SKUGenerator:
             # Return a fallback SKU
             return f"unknown-unknown-unknown-unknown-unknown-{reference_number}".lower()
 
-    def generate_sku_description(self, folder_path: str, output_file: str):
-        """Generate SKU description from images in the folder"""
-        folder = Path(folder_path)
+    @staticmethod
+    def _find_image_files(folder_path: str) -> List[str]:
+        """Return the sorted image file paths in a folder"""
+        # Get all image files (DirEntry caches the file type, so no extra stat calls)
+        with os.scandir(folder_path) as entries:
+            image_files = [
+                entry.path for entry in entries
+                if entry.is_file(follow_symlinks=False) and entry.name.lower().endswith(IMAGE_EXTENSIONS)
+            ]
         
-        # Get all image files
-        image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp'}
-        image_files = []
+        # Sort images by name for consistent processing
+        image_files.sort()
+        return image_files
+
+    @staticmethod
+    def _save_result(result, output_file: str):
+        """Write a generated description to the output file"""
+        # JSON and text outputs both get indented JSON for dict results
+        if isinstance(result, dict):
+            data = dump_json_bytes(result)
+        else:
+            data = str(result).encode('utf-8')
         
-        for file in folder.iterdir():
-            if file.suffix.lower() in image_extensions:
-                image_files.append(str(file))
+        # Single raw write of the pre-serialized bytes (no text/buffer layers)
+        fd = os.open(output_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+
+    def generate_sku_description(self, folder_path: str, output_file: str):
+        """Generate SKU description from images in the folder"""
+        image_files = self._find_image_files(folder_path)
         
         if not image_files:
             raise ValueError(f"No image files found in {folder_path}")
         
-        # Sort images by name for consistent processing
-        image_files.sort()
-        
         # Extract SKU from folder name
-        sku = folder.name
+        sku = Path(folder_path).name
         
         print(f"Processing {len(image_files)} images for SKU: {sku}")
         print(f"Images: {', '.join([Path(f).name for f in image_files])}")
@@ -156,32 +579,73 @@ class SKUGenerator:
         result = self.process_with_gemini_enhanced(image_files, sku, "")
         
         # Save to output file
-        if output_file.endswith('.json'):
-            # Save as JSON
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
-        else:
-            # Save as formatted text
-            with open(output_file, 'w', encoding='utf-8') as f:
-                if isinstance(result, dict):
-                    f.write(json.dumps(result, indent=2, ensure_ascii=False))
-                else:
-                    f.write(str(result))
+        self._save_result(result, output_file)
         
         print(f"Generated description saved to: {output_file}")
         return result
 
+    def generate_sku_batch(self, parent_folder: str, output_dir: str,
+                           max_concurrency: int = MAX_BATCH_CONCURRENCY) -> dict:
+        """Generate SKU descriptions for every sub-folder of parent_folder concurrently"""
+        with os.scandir(parent_folder) as entries:
+            folders = sorted(Path(entry.path) for entry in entries if entry.is_dir())
+        if not folders:
+            raise ValueError(f"No SKU folders found in {parent_folder}")
+        
+        os.makedirs(output_dir, exist_ok=True)
+        
+        async def run_batch():
+            semaphore = asyncio.Semaphore(max_concurrency)
+            
+            async def process_folder(folder: Path):
+                image_files = self._find_image_files(str(folder))
+                if not image_files:
+                    print(f"Warning: No image files found in {folder}, skipping")
+                    return None
+                
+                async with semaphore:
+                    print(f"Processing {len(image_files)} images for SKU: {folder.name}")
+                    result = await self.process_with_gemini_enhanced_async(image_files, folder.name, "")
+                
+                output_file = os.path.join(output_dir, f"{folder.name}.json")
+                self._save_result(result, output_file)
+                print(f"Generated description saved to: {output_file}")
+                return result
+            
+            return await asyncio.gather(*(process_folder(f) for f in folders), return_exceptions=True)
+        
+        results = {}
+        for folder, result in zip(folders, asyncio.run(run_batch())):
+            if isinstance(result, Exception):
+                print(f"Error processing {folder.name}: {result}")
+                results[folder.name] = {"error": str(result)}
+            elif result is not None:
+                results[folder.name] = result
+        return results
+
 
 def main():
     parser = argparse.ArgumentParser(description="Generate SKU descriptions from images using Google Gemini")
     parser.add_argument("--folder", required=True, help="Path to folder containing images")
+    parser.add_argument("--batch", action="store_true", help="Treat --folder as a parent of SKU folders and --output as the output directory")
     parser.add_argument("--api-key", required=True, help="Google Gemini API key")
     parser.add_argument("--output", default="generated_sku.json", help="Output file path (recommended: .json extension)")
+    parser.add_argument("--no-cache", action="store_true", help="Always call Gemini, bypassing the local response cache")
+    parser.add_argument("--context-cache", action="store_true", help="Cache the static prompt prefix on Gemini's side (context caching)")
+    parser.add_argument("--similar-cache", action="store_true", help="Reuse cached responses for near-duplicate image sets (requires imagehash)")
     
     args = parser.parse_args()
     
     try:
-        generator = SKUGenerator("gemini", args.api_key)
+        cache_path = None if args.no_cache else DEFAULT_CACHE_PATH
+        generator = SKUGenerator("gemini", args.api_key, cache_path=cache_path,
+                                 context_cache=args.context_cache,
+                                 similarity_cache=args.similar_cache)
+        if args.batch:
+            results = generator.generate_sku_batch(args.folder, args.output)
+            print(f"\nProcessed {len(results)} SKU folders into: {args.output}")
+            return 0
+        
         description = generator.generate_sku_description(args.folder, args.output)
         
         print("\nGenerated Description:")
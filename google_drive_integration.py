@@ -7,11 +7,55 @@ Handles uploading files to Google Drive and syncing CSV to Google Sheets
 import os
 import json
 import csv
-from typing import List, Dict, Optional
+import importlib.util
+import io
+import itertools
+import random
+import socket
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Dict, Optional
 from datetime import datetime
 
-# Google Drive imports
-try:
+# Google Drive libraries take hundreds of ms to import, so only check they are installed here
+# and import them on first use (see _import_google_libraries)
+GOOGLE_MODULES = (
+    'google.auth.transport.requests',
+    'google.oauth2.credentials',
+    'google_auth_oauthlib.flow',
+    'googleapiclient.discovery',
+    'google_auth_httplib2',
+    'httplib2',
+    'gspread',
+)
+
+def _module_available(name: str) -> bool:
+    """Check whether a module is installed without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:  # Parent package is missing
+        return False
+
+GOOGLE_DRIVE_AVAILABLE = all(_module_available(name) for name in GOOGLE_MODULES)
+if not GOOGLE_DRIVE_AVAILABLE:
+    print("Warning: Google Drive libraries not installed. Run: pip install -r requirements.txt")
+
+# Bound by _import_google_libraries(); nothing uses them before authentication
+Request = Credentials = service_account = InstalledAppFlow = None
+build = MediaFileUpload = MediaIoBaseUpload = HttpError = None
+google_auth_httplib2 = httplib2 = gspread = None
+# Network failures worth retrying for idempotent calls; extended with library errors on import
+TRANSPORT_ERRORS = (socket.timeout, ConnectionError)
+
+def _import_google_libraries():
+    """Import the Google client libraries into module globals (cheap after the first call)"""
+    global Request, Credentials, service_account, InstalledAppFlow, build
+    global MediaFileUpload, MediaIoBaseUpload, HttpError, google_auth_httplib2, httplib2, gspread
+    global TRANSPORT_ERRORS
+    if gspread is not None:
+        return
     from google.auth.transport.requests import Request
     from google.oauth2.credentials import Credentials
     from google.oauth2 import service_account
@@ -19,21 +63,181 @@ try:
     from googleapiclient.discovery import build
     from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
     from googleapiclient.errors import HttpError
+    import google_auth_httplib2
+    import httplib2
     import gspread
-    from oauth2client.service_account import ServiceAccountCredentials
-    GOOGLE_DRIVE_AVAILABLE = True
+    import requests
+    TRANSPORT_ERRORS = (socket.timeout, ConnectionError, httplib2.HttpLib2Error,
+                        requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+# Optional faster JSON serialization
+try:
+    import orjson
 except ImportError:
-    GOOGLE_DRIVE_AVAILABLE = False
-    print("Warning: Google Drive libraries not installed. Run: pip install -r requirements.txt")
+    orjson = None
+
+# Concurrent file uploads per SKU folder (Drive cannot batch media uploads)
+MAX_UPLOAD_WORKERS = 8
+
+# Files below this size use a single multipart request instead of a resumable session
+RESUMABLE_UPLOAD_THRESHOLD = 5 * 1024 * 1024
+RESUMABLE_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Rows per values.append call when streaming rows into Sheets
+SHEETS_APPEND_CHUNK_SIZE = 500
+# Rows per write request when replacing sheet contents (keeps requests well under the size limit)
+SHEETS_WRITE_CHUNK_SIZE = 500
+
+# Requests per Drive batch HTTP call (larger batches are prone to HTTP 500s)
+MAX_BATCH_SIZE = 25
+
+# Drive caps each appProperties entry (key + value) at 124 bytes
+APP_PROPERTY_MAX_BYTES = 124
+# Folder info above this size is uploaded as a JSON file instead of the folder description
+FOLDER_INFO_MAX_BYTES = 100 * 1024
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+# Header row style for inventory spreadsheets
+HEADER_FORMAT = {
+    'backgroundColor': {'red': 0.8, 'green': 0.8, 'blue': 0.8},
+    'textFormat': {'bold': True}
+}
+
+# HTTP statuses worth retrying (403 only when it reports a rate limit)
+RETRYABLE_STATUS_CODES = (403, 429, 500, 502, 503)
+# Statuses that mean the request was rejected before running, so even creates and appends can be retried
+RATE_LIMIT_STATUS_CODES = (403, 429)
+MAX_API_ATTEMPTS = 6
+# Upper bound on a single retry wait, whatever Retry-After asks for
+MAX_RETRY_DELAY = 120.0
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` calls per `per` seconds"""
+    def __init__(self, rate: int, per: float = 1.0):
+        self.capacity = rate
+        self.fill_rate = rate / per
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self, tokens: int = 1):
+        """Block until `tokens` calls may be made"""
+        tokens = min(tokens, self.capacity)
+        with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                time.sleep((tokens - self.tokens) / self.fill_rate)
+
+# Process-wide limits kept just under the per-user quotas, so parallel uploads don't hit 429s
+DRIVE_RATE_LIMITER = TokenBucket(8, 1.0)
+SHEETS_WRITE_RATE_LIMITER = TokenBucket(55, 60.0)
+
+def _retry_delay(error: Exception, attempt: int, idempotent: bool = True) -> Optional[float]:
+    """Seconds to wait before retrying a failed Google API call, or None if it should not be retried"""
+    backoff = 2 ** attempt + random.random()
+    if isinstance(error, HttpError):
+        status, headers, content = error.resp.status, error.resp, error.content or b''
+    elif isinstance(error, gspread.exceptions.APIError):
+        status, headers, content = error.response.status_code, error.response.headers, error.response.content or b''
+    elif isinstance(error, TRANSPORT_ERRORS):
+        # The request may have reached the server, so only idempotent calls are resent
+        return min(backoff, MAX_RETRY_DELAY) if idempotent else None
+    else:
+        return None
+    
+    if status not in (RETRYABLE_STATUS_CODES if idempotent else RATE_LIMIT_STATUS_CODES):
+        return None  # A 5xx may arrive after a create/append was committed; retrying would duplicate it
+    if status == 403 and b'ateLimitExceeded' not in content:
+        return None  # Permission errors never succeed on retry
+    
+    try:
+        # Never retry sooner than the server asked for
+        delay = max(float(headers.get('retry-after')), backoff)
+    except (TypeError, ValueError):
+        delay = backoff
+    return min(delay, MAX_RETRY_DELAY)
+
+def call_google_api(func, *args, limiter: Optional[TokenBucket] = None, idempotent: bool = True, **kwargs):
+    """Call a Google API function, rate limited and retried with exponential backoff (non-idempotent calls only on rate limits)"""
+    for attempt in range(MAX_API_ATTEMPTS):
+        if limiter:
+            limiter.acquire()
+        try:
+            return func(*args, **kwargs)
+        except Exception as error:
+            delay = _retry_delay(error, attempt, idempotent)
+            if delay is None or attempt == MAX_API_ATTEMPTS - 1:
+                raise
+            print(f"Google API call failed ({error}), retrying in {delay:.1f}s...")
+            time.sleep(delay)
+
+def execute_request(request, limiter: Optional[TokenBucket] = DRIVE_RATE_LIMITER, idempotent: bool = True):
+    """Execute a googleapiclient request with rate limiting and retries"""
+    return call_google_api(request.execute, limiter=limiter, idempotent=idempotent)
+
+def dumps_cell(value) -> str:
+    """Serialize a list/dict cell value as JSON text, using orjson when available"""
+    if orjson:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; let json handle them
+    return json.dumps(value, ensure_ascii=False)
+
+def serialize_rows(data: List[Dict], headers: List[str]) -> List[List[str]]:
+    """Convert dict rows to lists of cell strings in header order (lists/dicts as JSON, None as '')"""
+    complex_types = (list, dict)
+    return [
+        [dumps_cell(value) if isinstance(value, complex_types)
+         else '' if value is None else str(value)
+         for value in map(row.get, headers)]
+        for row in data
+    ]
+
+def _q_escape(value: str) -> str:
+    """Escape a string for use inside a quoted Drive query literal"""
+    return value.replace("\\", "\\\\").replace("'", "\\'")
+
+def find_sku_column(headers: List[str]) -> Optional[int]:
+    """Index of the first header containing 'sku' (case-insensitive), or None"""
+    return next((index for index, header in enumerate(headers) if 'sku' in header.lower()), None)
+
+# Google API scopes used for Drive and Sheets
+SCOPES = [
+    'https://www.googleapis.com/auth/drive',
+    'https://www.googleapis.com/auth/spreadsheets'
+]
+
+# Credentials loaded in this process, by credentials file path
+_credentials_cache: Dict[Optional[str], object] = {}
 
 class GoogleDriveIntegration:
-    def __init__(self, credentials_path: str = None):
+    def __init__(self, credentials_path: str = None, verify_on_init: bool = False):
         """Initialize Google Drive integration"""
         self.credentials_path = credentials_path
-        self.drive_service = None
-        self.sheets_service = None
-        self.gspread_client = None
+        # Verify credentials with an API call right after authenticating
+        self.verify_on_init = verify_on_init
+        self._drive_service = None
+        self._sheets_service = None
+        self._gspread_client = None
+        self._gspread_failed = False
+        self._authed_http = None
+        # Guards lazy construction of the services above
+        self._service_lock = threading.Lock()
         self._authenticated = False
+        self._creds = None
+        # Folder IDs by (name, parent_id); folders like SKU_Generator rarely change
+        self._folder_id_cache: Dict[tuple, str] = {}
+        # googleapiclient services are not thread-safe, so upload workers get their own
+        self._thread_local = threading.local()
+        # Kept for the instance's lifetime so each worker's Drive service and connections are reused across uploads
+        self._upload_executor = None
         
         # Don't authenticate immediately - wait until needed
         # if GOOGLE_DRIVE_AVAILABLE:
@@ -53,135 +257,272 @@ class GoogleDriveIntegration:
             return
             
         try:
-            # Google Drive API authentication
-            SCOPES = [
-                'https://www.googleapis.com/auth/drive',
-                'https://www.googleapis.com/auth/spreadsheets'
-            ]
-            
-            creds = None
-            token_path = 'token.json'
-            
-            # Check if we have valid credentials
-            if os.path.exists(token_path):
-                creds = Credentials.from_authorized_user_file(token_path, SCOPES)
-            
-            # If no valid credentials, get new ones
-            if not creds or not creds.valid:
-                if creds and creds.expired and creds.refresh_token:
-                    creds.refresh(Request())
-                else:
-                    if self.credentials_path and os.path.exists(self.credentials_path):
-                        # Try to determine if it's a service account or OAuth client
-                        try:
-                            with open(self.credentials_path, 'r') as f:
-                                cred_data = json.load(f)
-                            
-                            if 'client_email' in cred_data and 'private_key' in cred_data:
-                                # This is a service account credentials file
-                                from google.oauth2 import service_account
-                                creds = service_account.Credentials.from_service_account_file(
-                                    self.credentials_path, scopes=SCOPES)
-                            elif 'client_id' in cred_data and 'client_secret' in cred_data:
-                                # This is an OAuth client credentials file
-                                flow = InstalledAppFlow.from_client_secrets_file(
-                                    self.credentials_path, SCOPES)
-                                creds = flow.run_local_server(port=0)
-                            else:
-                                print("Warning: Credentials file format not recognized.")
-                                return
-                        except Exception as e:
-                            print(f"Error reading credentials file: {e}")
-                            return
-                    else:
-                        print("Warning: No credentials file found. Google Drive features will be disabled.")
-                        return
-                
-                # Save credentials for next run (only for OAuth flow)
-                if not hasattr(creds, 'service_account_email'):  # Not a service account
-                    with open(token_path, 'w') as token:
-                        token.write(creds.to_json())
-            
-            # Build services
-            self.drive_service = build('drive', 'v3', credentials=creds)
-            self.sheets_service = build('sheets', 'v4', credentials=creds)
-            
-            # GSpread client for Google Sheets
-            scope = ['https://spreadsheets.google.com/feeds',
-                    'https://www.googleapis.com/auth/drive']
-            
-            try:
-                if hasattr(creds, 'service_account_email'):
-                    # Service account authentication
-                    print("Using service account authentication for gspread")
-                    self.gspread_client = gspread.service_account(filename=self.credentials_path)
-                else:
-                    # OAuth authentication
-                    print("Using OAuth authentication for gspread")
-                    self.gspread_client = gspread.authorize(creds)
-                
-                # Test the gspread client
-                if self.gspread_client:
-                    print("gspread client initialized successfully")
-                    # Simple authentication test without listing all spreadsheetsc
-                    try:
-                        # Just test if we can create a temporary test spreadsheet
-                        test_spreadsheet = self.gspread_client.create("TEST_AUTH")
-                        # Use the correct method to delete the spreadsheet
-                        try:
-                            test_spreadsheet.delete()  # Try the old method first
-                        except AttributeError:
-                            # For newer gspread versions, use the client to delete
-                            self.gspread_client.del_spreadsheet(test_spreadsheet.id)
-                        print("Successfully authenticated with Google Sheets.")
-                    except Exception as test_error:
-                        print(f"Warning: gspread authentication test failed: {test_error}")
-                else:
-                    print("Warning: gspread client is None")
-                    
-            except Exception as gspread_error:
-                print(f"Error initializing gspread client: {gspread_error}")
-                self.gspread_client = None
-            
+            _import_google_libraries()
+            
+            # Reuse credentials already loaded in this process (token still valid, or
+            # a service account, which refreshes itself) instead of reloading/refreshing
+            creds = _credentials_cache.get(self.credentials_path)
+            if creds is None or not (creds.valid or hasattr(creds, 'service_account_email')):
+                creds = self._load_credentials()
+                if creds is None:
+                    return
+                _credentials_cache[self.credentials_path] = creds
+            
+            # Services and the gspread client are built lazily on first use
+            self._creds = creds
             self._authenticated = True
+            
+            if self.verify_on_init:
+                # A free metadata read proves the credentials without using write quota
+                try:
+                    execute_request(self.drive_service.about().get(fields='user'))
+                    print("Successfully verified Google credentials with Drive.")
+                except Exception as test_error:
+                    print(f"Warning: Drive credential check failed: {test_error}")
                 
         except Exception as e:
             print(f"Error authenticating with Google: {e}")
             import traceback
             traceback.print_exc()
-            self.drive_service = None
-            self.sheets_service = None
-            self.gspread_client = None
+            self._creds = None
             self._authenticated = False
     
+    @property
+    def drive_service(self):
+        """Drive v3 service, built on first use after authentication"""
+        if self._drive_service is None and self._creds is not None:
+            with self._service_lock:
+                if self._drive_service is None:
+                    self._drive_service = build('drive', 'v3', http=self._get_shared_http(),
+                                                cache_discovery=False, static_discovery=True)
+        return self._drive_service
+    
+    @property
+    def sheets_service(self):
+        """Sheets v4 service, built on first use after authentication"""
+        if self._sheets_service is None and self._creds is not None:
+            with self._service_lock:
+                if self._sheets_service is None:
+                    self._sheets_service = build('sheets', 'v4', http=self._get_shared_http(),
+                                                 cache_discovery=False, static_discovery=True)
+        return self._sheets_service
+    
+    @property
+    def gspread_client(self):
+        """gspread client sharing the same credentials, created on first use after authentication"""
+        if self._gspread_client is None and self._creds is not None and not self._gspread_failed:
+            with self._service_lock:
+                if self._gspread_client is None and not self._gspread_failed:
+                    try:
+                        # Share the same credentials (and access token) with gspread
+                        if hasattr(self._creds, 'service_account_email'):
+                            print("Using service account authentication for gspread")
+                        else:
+                            print("Using OAuth authentication for gspread")
+                        self._gspread_client = gspread.authorize(self._creds)
+                        print("gspread client initialized successfully")
+                    except Exception as gspread_error:
+                        print(f"Error initializing gspread client: {gspread_error}")
+                        self._gspread_failed = True
+        return self._gspread_client
+    
+    def _get_shared_http(self):
+        """Authorized HTTP client shared by the main Drive and Sheets services (caller holds the lock)"""
+        if self._authed_http is None:
+            self._authed_http = self._new_authorized_http()
+        return self._authed_http
+    
+    def _load_credentials(self):
+        """Load, refresh or create Google credentials; returns None if unavailable"""
+        creds = None
+        token_path = 'token.json'
+        
+        # Check if we have valid credentials
+        if os.path.exists(token_path):
+            creds = Credentials.from_authorized_user_file(token_path, SCOPES)
+        
+        # If no valid credentials, get new ones
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+            else:
+                if self.credentials_path and os.path.exists(self.credentials_path):
+                    # Try to determine if it's a service account or OAuth client
+                    try:
+                        with open(self.credentials_path, 'r') as f:
+                            cred_data = json.load(f)
+                        
+                        if 'client_email' in cred_data and 'private_key' in cred_data:
+                            # This is a service account credentials file
+                            from google.oauth2 import service_account
+                            creds = service_account.Credentials.from_service_account_file(
+                                self.credentials_path, scopes=SCOPES)
+                        elif 'client_id' in cred_data and 'client_secret' in cred_data:
+                            # This is an OAuth client credentials file
+                            flow = InstalledAppFlow.from_client_secrets_file(
+                                self.credentials_path, SCOPES)
+                            creds = flow.run_local_server(port=0)
+                        else:
+                            print("Warning: Credentials file format not recognized.")
+                            return None
+                    except Exception as e:
+                        print(f"Error reading credentials file: {e}")
+                        return None
+                else:
+                    print("Warning: No credentials file found. Google Drive features will be disabled.")
+                    return None
+            
+            # Save credentials for next run (only for OAuth flow)
+            if not hasattr(creds, 'service_account_email'):  # Not a service account
+                with open(token_path, 'w') as token:
+                    token.write(creds.to_json())
+        
+        return creds
+    
+    def _new_authorized_http(self):
+        """Create an authorized HTTP client; httplib2 objects must not be shared across threads"""
+        return google_auth_httplib2.AuthorizedHttp(self._creds, http=httplib2.Http())
+    
+    @property
+    def upload_executor(self) -> ThreadPoolExecutor:
+        """Thread pool for concurrent uploads, created on first use"""
+        if self._upload_executor is None:
+            with self._service_lock:
+                if self._upload_executor is None:
+                    self._upload_executor = ThreadPoolExecutor(max_workers=MAX_UPLOAD_WORKERS,
+                                                               thread_name_prefix='drive-upload')
+        return self._upload_executor
+    
+    def _get_thread_drive_service(self):
+        """Get a Drive service owned by the current thread (for concurrent uploads)"""
+        service = getattr(self._thread_local, 'drive_service', None)
+        if service is None:
+            service = build('drive', 'v3', http=self._new_authorized_http(),
+                            cache_discovery=False, static_discovery=True)
+            self._thread_local.drive_service = service
+        return service
+    
+    def _batch_execute(self, requests: List) -> List:
+        """Run non-media Drive requests through batch HTTP calls; failed requests yield None"""
+        responses = [None] * len(requests)
+        
+        def callback(request_id, response, exception):
+            if exception is not None:
+                print(f'Error in batch request: {exception}')
+            else:
+                responses[int(request_id)] = response
+        
+        for start in range(0, len(requests), MAX_BATCH_SIZE):
+            batch = self.drive_service.new_batch_http_request(callback=callback)
+            chunk = requests[start:start + MAX_BATCH_SIZE]
+            for i, request in enumerate(chunk, start):
+                batch.add(request, request_id=str(i))
+            # Each request in a batch counts against the quota separately; acquire one token
+            # per request, since a single acquire is capped at the bucket's capacity
+            for _ in chunk:
+                DRIVE_RATE_LIMITER.acquire()
+            execute_request(batch, limiter=None)
+        
+        return responses
+    
+    def _find_main_and_sku_folders(self, main_folder_name: str, sku: str):
+        """Look up the main folder and the SKU folder inside it in one batch round trip"""
+        # Skip the network entirely when the main folder ID is already cached
+        main_folder_id = self._folder_id_cache.get((main_folder_name, None))
+        if main_folder_id:
+            return main_folder_id, self.find_folder_by_name(sku, main_folder_id)
+        
+        folder_query = f"mimeType='{FOLDER_MIME_TYPE}' and trashed=false"
+        try:
+            main_response, sku_response = self._batch_execute([
+                self.drive_service.files().list(
+                    q=f"name='{_q_escape(main_folder_name)}' and {folder_query} and 'root' in parents",
+                    spaces='drive',
+                    fields='nextPageToken, files(id)'
+                ),
+                # The main folder ID is not known yet, so match on parents afterwards
+                self.drive_service.files().list(
+                    q=f"name='{_q_escape(sku)}' and {folder_query}",
+                    spaces='drive',
+                    fields='files(id, parents)'
+                )
+            ])
+        except HttpError as error:
+            print(f'Error in batch folder lookup: {error}')
+            main_response = sku_response = None
+        
+        if main_response is None or sku_response is None:
+            # Fall back to sequential lookups rather than risk creating duplicate folders
+            main_folder_id = self.find_folder_by_name(main_folder_name)
+            sku_folder_id = self.find_folder_by_name(sku, main_folder_id) if main_folder_id else None
+            return main_folder_id, sku_folder_id
+        
+        main_files = main_response.get('files', [])
+        if not main_files:
+            if main_response.get('nextPageToken'):
+                # An empty first page doesn't mean no match; page through before reporting it missing
+                main_folder_id = self.find_folder_by_name(main_folder_name)
+                return main_folder_id, self.find_folder_by_name(sku, main_folder_id) if main_folder_id else None
+            return None, None
+        main_folder_id = main_files[0]['id']
+        self._folder_id_cache[(main_folder_name, None)] = main_folder_id
+        
+        for folder in sku_response.get('files', []):
+            if main_folder_id in folder.get('parents', []):
+                self._folder_id_cache[(sku, main_folder_id)] = folder['id']
+                return main_folder_id, folder['id']
+        return main_folder_id, None
+    
+    def _find_first_file_id(self, query: str) -> Optional[str]:
+        """ID of the first file matching a Drive query, or None"""
+        page_token = None
+        while True:
+            results = execute_request(self.drive_service.files().list(
+                q=query,
+                spaces='drive',
+                pageToken=page_token,
+                fields='nextPageToken, files(id)'
+            ))
+            files = results.get('files', [])
+            if files:
+                return files[0]['id']
+            # Drive may return an empty page that still has more results behind it
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return None
+    
     def find_folder_by_name(self, folder_name: str, parent_folder_id: str = None) -> Optional[str]:
         """Find a folder by name in Google Drive"""
         # Only authenticate when actually needed for upload operations
         if not self.drive_service:
             return None
+        
+        cache_key = (folder_name, parent_folder_id)
+        if cache_key in self._folder_id_cache:
+            return self._folder_id_cache[cache_key]
             
         try:
-            query = f"name='{folder_name}' and mimeType='application/vnd.google-apps.folder' and trashed=false"
+            query = f"name='{_q_escape(folder_name)}' and mimeType='{FOLDER_MIME_TYPE}' and trashed=false"
             if parent_folder_id:
                 query += f" and '{parent_folder_id}' in parents"
             else:
                 query += " and 'root' in parents"
             
-            results = self.drive_service.files().list(
-                q=query,
-                spaces='drive',
-                fields='files(id, name)'
-            ).execute()
-            
-            files = results.get('files', [])
-            if files:
-                return files[0]['id']  # Return first matching folder
-            return None
+            folder_id = self._find_first_file_id(query)
+            if folder_id:
+                self._folder_id_cache[cache_key] = folder_id
+            return folder_id
             
         except HttpError as error:
             print(f'Error finding folder: {error}')
             return None
     
+    def _invalidate_folder_id(self, folder_id: str):
+        """Drop a folder ID from the cache (e.g. after Drive reports it missing)"""
+        for key, cached_id in list(self._folder_id_cache.items()):
+            if cached_id == folder_id:
+                self._folder_id_cache.pop(key, None)
+    
     def create_folder(self, folder_name: str, parent_folder_id: str = None) -> Optional[str]:
         """Create a folder in Google Drive"""
         # Only authenticate when actually needed for upload operations
@@ -197,21 +538,27 @@ class GoogleDriveIntegration:
             if parent_folder_id:
                 folder_metadata['parents'] = [parent_folder_id]
             
-            folder = self.drive_service.files().create(
+            folder = execute_request(self.drive_service.files().create(
                 body=folder_metadata,
                 fields='id'
-            ).execute()
+            ), idempotent=False)
             
+            if folder.get('id'):
+                self._folder_id_cache[(folder_name, parent_folder_id)] = folder['id']
             return folder.get('id')
         except HttpError as error:
             print(f'Error creating folder: {error}')
+            if error.resp.status == 404 and parent_folder_id:
+                self._invalidate_folder_id(parent_folder_id)
             return None
     
-    def upload_file(self, file_path: str, folder_id: str = None, filename: str = None) -> Optional[str]:
-        """Upload a file to Google Drive"""
+    def upload_file(self, file_path: str, folder_id: str = None, filename: str = None,
+                    service=None, file_size: int = None) -> Optional[str]:
+        """Upload a file to Google Drive (optionally through a specific Drive service)"""
         # Only authenticate when actually needed for upload operations
         if not self.drive_service:
             return None
+        service = service or self.drive_service
             
         try:
             if not filename:
@@ -224,20 +571,28 @@ class GoogleDriveIntegration:
             if folder_id:
                 file_metadata['parents'] = [folder_id]
             
-            media = MediaFileUpload(file_path, resumable=True)
+            if file_size is None:
+                file_size = os.path.getsize(file_path)
+            if file_size < RESUMABLE_UPLOAD_THRESHOLD:
+                media = MediaFileUpload(file_path, resumable=False)
+            else:
+                media = MediaFileUpload(file_path, resumable=True, chunksize=RESUMABLE_CHUNK_SIZE)
             
-            file = self.drive_service.files().create(
+            file = execute_request(service.files().create(
                 body=file_metadata,
                 media_body=media,
                 fields='id'
-            ).execute()
+            ), idempotent=False)
             
             return file.get('id')
         except HttpError as error:
             print(f'Error uploading file: {error}')
+            if error.resp.status == 404 and folder_id:
+                self._invalidate_folder_id(folder_id)
             return None
     
-    def upload_file_from_data(self, file_data: str, filename: str, folder_id: str = None) -> Optional[str]:
+    def upload_file_from_data(self, file_data: str, filename: str, folder_id: str = None,
+                              mimetype: str = 'application/octet-stream') -> Optional[str]:
         """Upload file data directly to Google Drive"""
         # Only authenticate when actually needed for upload operations
         if not self.drive_service:
@@ -253,23 +608,34 @@ class GoogleDriveIntegration:
             if folder_id:
                 file_metadata['parents'] = [folder_id]
             
+            resumable = len(file_data) >= RESUMABLE_UPLOAD_THRESHOLD
             media = MediaIoBaseUpload(
                 BytesIO(file_data),
-                mimetype='application/octet-stream',
-                resumable=True
+                mimetype=mimetype,
+                chunksize=RESUMABLE_CHUNK_SIZE,
+                resumable=resumable
             )
             
-            file = self.drive_service.files().create(
+            file = execute_request(self.drive_service.files().create(
                 body=file_metadata,
                 media_body=media,
                 fields='id'
-            ).execute()
+            ), idempotent=False)
             
             return file.get('id')
         except HttpError as error:
             print(f'Error uploading file data: {error}')
             return None
     
+    def _upload_zip_bundle(self, zip_name: str, file_paths: List[str], folder_id: str) -> Optional[str]:
+        """Zip files in memory and upload the archive in a single request"""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for file_path in file_paths:
+                archive.write(file_path, os.path.basename(file_path))
+        return self.upload_file_from_data(buffer.getvalue(), zip_name, folder_id,
+                                          mimetype='application/zip')
+    
 
 
     def _find_spreadsheet_in_folder(self, spreadsheet_name: str) -> Optional[str]:
@@ -285,18 +651,9 @@ class GoogleDriveIntegration:
                 return None
             
             # Search for the spreadsheet inside the SKU_Generator folder
-            query = f"name='{spreadsheet_name}' and mimeType='application/vnd.google-apps.spreadsheet' and trashed=false and '{main_folder_id}' in parents"
-            
-            results = self.drive_service.files().list(
-                q=query,
-                spaces='drive',
-                fields='files(id, name)'
-            ).execute()
+            query = f"name='{_q_escape(spreadsheet_name)}' and mimeType='application/vnd.google-apps.spreadsheet' and trashed=false and '{main_folder_id}' in parents"
             
-            files = results.get('files', [])
-            if files:
-                return files[0]['id']  # Return first matching spreadsheet
-            return None
+            return self._find_first_file_id(query)
             
         except HttpError as error:
             print(f'Error finding spreadsheet in folder: {error}')
@@ -319,16 +676,16 @@ class GoogleDriveIntegration:
                 return None
             
             # Create the spreadsheet using gspread
-            spreadsheet = self.gspread_client.create(spreadsheet_name)
+            spreadsheet = call_google_api(self.gspread_client.create, spreadsheet_name, limiter=SHEETS_WRITE_RATE_LIMITER, idempotent=False)
             spreadsheet_id = spreadsheet.id
             
             # Move the spreadsheet to the SKU_Generator folder
-            file = self.drive_service.files().update(
+            file = execute_request(self.drive_service.files().update(
                 fileId=spreadsheet_id,
                 addParents=main_folder_id,
                 removeParents='root',
                 fields='id, parents'
-            ).execute()
+            ))
             
             print(f"Created new spreadsheet '{spreadsheet_name}' in SKU_Generator folder: {spreadsheet_id}")
             return spreadsheet_id
@@ -392,9 +749,9 @@ class GoogleDriveIntegration:
                         print(f"Created new spreadsheet: {spreadsheet.title}")
                     else:
                         print("Warning: Could not create spreadsheet in folder, creating in root...")
-                        spreadsheet = self.gspread_client.create(spreadsheet_name)
+                        spreadsheet = call_google_api(self.gspread_client.create, spreadsheet_name, limiter=SHEETS_WRITE_RATE_LIMITER, idempotent=False)
                 else:
-                    spreadsheet = self.gspread_client.create(spreadsheet_name)
+                    spreadsheet = call_google_api(self.gspread_client.create, spreadsheet_name, limiter=SHEETS_WRITE_RATE_LIMITER, idempotent=False)
                 
             except Exception as e:
                 print(f"Error accessing spreadsheet: {e}")
@@ -413,38 +770,34 @@ class GoogleDriveIntegration:
                 print(f"Error accessing worksheet: {e}")
                 return None
             
-            # Clear existing data
-            print("Clearing existing data...")
-            worksheet.clear()
-            
             # Prepare headers and data
+            rows = []
             if data:
                 headers = list(data[0].keys())
-                rows = [headers]
-                
-                for row in data:
-                    row_values = []
-                    for header in headers:
-                        value = row.get(header, '')
-                        # Convert lists and complex objects to strings
-                        if isinstance(value, (list, dict)):
-                            value = json.dumps(value, ensure_ascii=False)
-                        row_values.append(str(value))
-                    rows.append(row_values)
-                
-                # Update worksheet
-                print(f"Updating worksheet with {len(rows)} rows...")
-                worksheet.update('A1', rows)
-                
-                # Format header row
-                try:
-                    worksheet.format('A1:Z1', {
-                        'backgroundColor': {'red': 0.8, 'green': 0.8, 'blue': 0.8},
-                        'textFormat': {'bold': True}
-                    })
+                rows = [headers] + serialize_rows(data, headers)
+            
+            if self.sheets_service:
+                # Clear, write values and format the header in a single batchUpdate
+                print(f"Replacing worksheet data with {len(rows)} rows...")
+                self._replace_sheet_rows(spreadsheet.id, worksheet, rows)
+                if rows:
                     print("Header formatting applied")
-                except Exception as format_error:
-                    print(f"Warning: Header formatting failed: {format_error}")
+            else:
+                # Clear existing data
+                print("Clearing existing data...")
+                call_google_api(worksheet.clear, limiter=SHEETS_WRITE_RATE_LIMITER)
+                
+                if rows:
+                    # Update worksheet
+                    print(f"Updating worksheet with {len(rows)} rows...")
+                    self._update_in_chunks(worksheet, rows)
+                    
+                    # Format header row
+                    try:
+                        call_google_api(worksheet.format, 'A1:Z1', HEADER_FORMAT, limiter=SHEETS_WRITE_RATE_LIMITER)
+                        print("Header formatting applied")
+                    except Exception as format_error:
+                        print(f"Warning: Header formatting failed: {format_error}")
             
             print(f"Spreadsheet updated successfully: {spreadsheet.url}")
             return spreadsheet.url
@@ -455,6 +808,77 @@ class GoogleDriveIntegration:
             traceback.print_exc()
             return None
     
+    def _replace_sheet_rows(self, spreadsheet_id: str, worksheet, rows: List[List[str]],
+                            format_header: bool = True, chunk_size: int = SHEETS_WRITE_CHUNK_SIZE):
+        """Clear the sheet, write rows from A1 and style the header row via spreadsheets.batchUpdate
+
+        The clear, resize, header format and first chunk of rows go in one call;
+        any further rows follow in chunk_size slices.
+        """
+        sheet_id = worksheet.id
+        # Clear all values (formatting is kept, as with worksheet.clear())
+        requests = [{'updateCells': {'range': {'sheetId': sheet_id}, 'fields': 'userEnteredValue'}}]
+        if rows:
+            requests.extend(self._write_rows_requests(worksheet, rows, format_header, chunk_size))
+        execute_request(self.sheets_service.spreadsheets().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={'requests': requests}
+        ), limiter=SHEETS_WRITE_RATE_LIMITER)
+        
+        # Sequential on purpose: the shared service is not thread-safe and the write limiter serializes anyway
+        for start in range(chunk_size, len(rows), chunk_size):
+            execute_request(self.sheets_service.spreadsheets().batchUpdate(
+                spreadsheetId=spreadsheet_id,
+                body={'requests': [self._update_cells_request(sheet_id, rows[start:start + chunk_size], start)]}
+            ), limiter=SHEETS_WRITE_RATE_LIMITER)
+    
+    @staticmethod
+    def _update_cells_request(sheet_id: int, rows: List[List[str]], start_row: int) -> Dict:
+        """updateCells request writing rows as strings starting at a 0-based row index"""
+        return {'updateCells': {
+            'start': {'sheetId': sheet_id, 'rowIndex': start_row, 'columnIndex': 0},
+            'rows': [
+                {'values': [{'userEnteredValue': {'stringValue': value}} for value in row]}
+                for row in rows
+            ],
+            'fields': 'userEnteredValue'
+        }}
+    
+    def _write_rows_requests(self, worksheet, rows: List[List[str]], format_header: bool,
+                             chunk_size: int = SHEETS_WRITE_CHUNK_SIZE) -> List[Dict]:
+        """batchUpdate requests that size the grid, write the first chunk of rows and optionally style the header"""
+        sheet_id = worksheet.id
+        num_cols = max(len(row) for row in rows)
+        requests = [
+            # Grow the grid first so the rows always fit
+            {'updateSheetProperties': {
+                'properties': {
+                    'sheetId': sheet_id,
+                    'gridProperties': {
+                        'rowCount': max(worksheet.row_count, len(rows)),
+                        'columnCount': max(worksheet.col_count, num_cols)
+                    }
+                },
+                'fields': 'gridProperties(rowCount,columnCount)'
+            }},
+            self._update_cells_request(sheet_id, rows[:chunk_size], 0)
+        ]
+        if format_header:
+            requests.append({'repeatCell': {
+                'range': {'sheetId': sheet_id, 'startRowIndex': 0, 'endRowIndex': 1,
+                          'startColumnIndex': 0, 'endColumnIndex': 26},
+                'cell': {'userEnteredFormat': HEADER_FORMAT},
+                'fields': 'userEnteredFormat(backgroundColor,textFormat)'
+            }})
+        return requests
+    
+    @staticmethod
+    def _update_in_chunks(worksheet, rows: List[List[str]], chunk_size: int = SHEETS_WRITE_CHUNK_SIZE):
+        """Write rows from A1 through gspread, one values.update per chunk of rows"""
+        for start in range(0, len(rows), chunk_size):
+            call_google_api(worksheet.update, f'A{start + 1}', rows[start:start + chunk_size],
+                            limiter=SHEETS_WRITE_RATE_LIMITER)
+    
     def quick_update_spreadsheet(self, spreadsheet_name: str, data: List[Dict], 
                                 sheet_name: str = "Inventory") -> Optional[str]:
         """Quick update spreadsheet without folder optimization checks (faster, fewer API calls)"""
@@ -490,9 +914,9 @@ class GoogleDriveIntegration:
                         print(f"Created new spreadsheet: {spreadsheet.title}")
                     else:
                         print("Warning: Could not create spreadsheet in folder, creating in root...")
-                        spreadsheet = self.gspread_client.create(spreadsheet_name)
+                        spreadsheet = call_google_api(self.gspread_client.create, spreadsheet_name, limiter=SHEETS_WRITE_RATE_LIMITER, idempotent=False)
                 else:
-                    spreadsheet = self.gspread_client.create(spreadsheet_name)
+                    spreadsheet = call_google_api(self.gspread_client.create, spreadsheet_name, limiter=SHEETS_WRITE_RATE_LIMITER, idempotent=False)
             
             # Get or create worksheet
             try:
@@ -505,22 +929,19 @@ class GoogleDriveIntegration:
             
             # Clear existing data and update
             print("Updating worksheet data...")
-            worksheet.clear()
-            
+            rows = []
             if data:
                 headers = list(data[0].keys())
-                rows = [headers]
-                
-                for row in data:
-                    row_values = []
-                    for header in headers:
-                        value = row.get(header, '')
-                        if isinstance(value, (list, dict)):
-                            value = json.dumps(value, ensure_ascii=False)
-                        row_values.append(str(value))
-                    rows.append(row_values)
-                
-                worksheet.update('A1', rows)
+                rows = [headers] + serialize_rows(data, headers)
+            
+            if self.sheets_service:
+                # Clear and write in a single batchUpdate (one write request instead of two)
+                self._replace_sheet_rows(spreadsheet.id, worksheet, rows, format_header=False)
+            else:
+                call_google_api(worksheet.clear, limiter=SHEETS_WRITE_RATE_LIMITER)
+                if rows:
+                    self._update_in_chunks(worksheet, rows)
+            if rows:
                 print(f"Updated {len(rows)} rows successfully")
             
             return spreadsheet.url
@@ -532,6 +953,13 @@ class GoogleDriveIntegration:
     def smart_update_spreadsheet(self, spreadsheet_name: str, new_data: List[Dict], 
                                 sheet_name: str = "Inventory") -> Optional[str]:
         """Smart update: only adds new rows, doesn't overwrite existing data"""
+        headers = list(new_data[0].keys()) if new_data else []
+        return self._smart_append_rows(spreadsheet_name, headers,
+                                       serialize_rows(new_data, headers), sheet_name)
+    
+    def _smart_append_rows(self, spreadsheet_name: str, headers: List[str],
+                           rows: Iterable[List[str]], sheet_name: str = "Inventory") -> Optional[str]:
+        """Append rows whose SKU is not in the sheet yet, streaming them in chunks"""
         self._ensure_authenticated()
         if not self.gspread_client:
             print("Error: gspread client not initialized")
@@ -564,9 +992,9 @@ class GoogleDriveIntegration:
                         print(f"Created new spreadsheet: {spreadsheet.title}")
                     else:
                         print("Warning: Could not create spreadsheet in folder, creating in root...")
-                        spreadsheet = self.gspread_client.create(spreadsheet_name)
+                        spreadsheet = call_google_api(self.gspread_client.create, spreadsheet_name, limiter=SHEETS_WRITE_RATE_LIMITER, idempotent=False)
                 else:
-                    spreadsheet = self.gspread_client.create(spreadsheet_name)
+                    spreadsheet = call_google_api(self.gspread_client.create, spreadsheet_name, limiter=SHEETS_WRITE_RATE_LIMITER, idempotent=False)
             
             # Get or create worksheet
             try:
@@ -577,75 +1005,71 @@ class GoogleDriveIntegration:
                 worksheet = spreadsheet.add_worksheet(title=sheet_name, rows=1000, cols=30)
                 print(f"Created new worksheet: {worksheet.title}")
             
-            # Get existing data to check for duplicates
+            # Get existing SKUs to check for duplicates (header row + SKU column only)
             try:
-                existing_data = worksheet.get_all_records()
+                existing_headers = call_google_api(worksheet.row_values, 1)
                 existing_skus = set()
-                if existing_data:
+                if existing_headers:
                     # Find the SKU column (could be 'SKU', 'sku', or similar)
-                    sku_column = None
-                    for col in existing_data[0].keys():
-                        if 'sku' in col.lower():
-                            sku_column = col
-                            break
+                    sku_column_index = find_sku_column(existing_headers)
                     
-                    if sku_column:
-                        existing_skus = {str(row[sku_column]).strip() for row in existing_data if row[sku_column]}
+                    if sku_column_index is not None:
+                        # Fetch only that column; its flat value list becomes the lookup set
+                        sku_values = call_google_api(worksheet.col_values, sku_column_index + 1)[1:]
+                        existing_skus = {str(value).strip() for value in sku_values if value}
                         print(f"Found {len(existing_skus)} existing SKUs in spreadsheet")
                     else:
                         print("Warning: No SKU column found in existing data")
                 
             except Exception as e:
                 print(f"Warning: Could not read existing data: {e}")
-                existing_data = []
+                existing_headers = []
                 existing_skus = set()
             
-            # Filter out data that already exists
-            new_rows = []
+            # Find SKU column in new data
+            sku_index_new = find_sku_column(headers)
+            
+            if not headers:
+                return spreadsheet.url
+            if sku_index_new is None:
+                print("Warning: No SKU column found in new data")
+                return spreadsheet.url
+            
+            # Filter out data that already exists, appending new rows in chunks
             added_count = 0
             skipped_count = 0
-            
-            if new_data:
-                headers = list(new_data[0].keys())
-                
-                # Find SKU column in new data
-                sku_column_new = None
-                for col in headers:
-                    if 'sku' in col.lower():
-                        sku_column_new = col
-                        break
-                
-                if sku_column_new:
-                    for row in new_data:
-                        sku_value = str(row.get(sku_column_new, '')).strip()
-                        if sku_value and sku_value not in existing_skus:
-                            # This is a new SKU, add it
-                            row_values = []
-                            for header in headers:
-                                value = row.get(header, '')
-                                if isinstance(value, (list, dict)):
-                                    value = json.dumps(value, ensure_ascii=False)
-                                row_values.append(str(value))
-                            new_rows.append(row_values)
-                            added_count += 1
-                        else:
-                            skipped_count += 1
-                    
-                    if new_rows:
-                        # Add headers if this is a new spreadsheet
-                        if not existing_data:
-                            new_rows.insert(0, headers)
-                        
-                        # Find the next empty row
-                        next_row = len(existing_data) + 2 if existing_data else 1  # +2 because existing_data doesn't include headers
-                        
-                        # Update the worksheet with new rows
-                        worksheet.update(f'A{next_row}', new_rows)
-                        print(f"Added {added_count} new rows, skipped {skipped_count} existing SKUs")
-                    else:
-                        print("No new SKUs to add - all data already exists in spreadsheet")
+            pending_rows = [] if existing_headers else [headers]  # Add headers if this is a new spreadsheet
+            
+            def flush(rows_to_append):
+                # Append after the last row of the table in one atomic values.append call
+                call_google_api(
+                    worksheet.append_rows,
+                    rows_to_append,
+                    limiter=SHEETS_WRITE_RATE_LIMITER,
+                    idempotent=False,
+                    value_input_option='RAW',
+                    insert_data_option='INSERT_ROWS',
+                    table_range='A1'
+                )
+            
+            for row in rows:
+                sku_value = row[sku_index_new].strip() if sku_index_new < len(row) else ''
+                if sku_value and sku_value not in existing_skus:
+                    # This is a new SKU, add it
+                    pending_rows.append(row)
+                    added_count += 1
+                    if len(pending_rows) >= SHEETS_APPEND_CHUNK_SIZE:
+                        flush(pending_rows)
+                        pending_rows = []
                 else:
-                    print("Warning: No SKU column found in new data")
+                    skipped_count += 1
+            
+            if added_count:
+                if pending_rows:
+                    flush(pending_rows)
+                print(f"Added {added_count} new rows, skipped {skipped_count} existing SKUs")
+            else:
+                print("No new SKUs to add - all data already exists in spreadsheet")
             
             return spreadsheet.url
             
@@ -655,9 +1079,37 @@ class GoogleDriveIntegration:
             traceback.print_exc()
             return None
     
+    def _set_folder_info(self, folder_id: str, folder_info: Dict) -> bool:
+        """Store folder info as appProperties plus a JSON description on the Drive folder"""
+        if orjson:
+            description = orjson.dumps(folder_info, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        else:
+            description = json.dumps(folder_info, ensure_ascii=False)
+        if len(description.encode('utf-8')) > FOLDER_INFO_MAX_BYTES:
+            return False
+        
+        # Searchable key fields, skipping any that exceed Drive's per-entry limit
+        app_properties = {}
+        for key in ('sku', 'reference_number', 'chinese_description', 'upload_date'):
+            value = str(folder_info.get(key) or '')
+            if value and len((key + value).encode('utf-8')) <= APP_PROPERTY_MAX_BYTES:
+                app_properties[key] = value
+        
+        try:
+            execute_request(self.drive_service.files().update(
+                fileId=folder_id,
+                body={'appProperties': app_properties, 'description': description},
+                fields='id'
+            ))
+            return True
+        except HttpError as error:
+            print(f'Error saving folder info: {error}')
+            return False
+    
     def upload_sku_to_drive(self, sku: str, local_sku_folder: str, 
-                           chinese_description: str = "", reference_number: str = "") -> Dict:
-        """Upload complete SKU folder to Google Drive"""
+                           chinese_description: str = "", reference_number: str = "",
+                           bundle_mode: bool = False) -> Dict:
+        """Upload complete SKU folder to Google Drive (as a single zip when bundle_mode is set)"""
         self._ensure_authenticated()
         if not self.drive_service:
             return {"success": False, "error": "Google Drive not authenticated"}
@@ -666,8 +1118,8 @@ class GoogleDriveIntegration:
             # Use consistent main folder name (no timestamp)
             main_folder_name = "SKU_Generator"
             
-            # Try to find existing main folder first
-            main_folder_id = self.find_folder_by_name(main_folder_name)
+            # Find existing main and SKU folders together (one batch request)
+            main_folder_id, existing_sku_folder_id = self._find_main_and_sku_folders(main_folder_name, sku)
             if not main_folder_id:
                 # Create main folder only if it doesn't exist
                 main_folder_id = self.create_folder(main_folder_name)
@@ -678,7 +1130,6 @@ class GoogleDriveIntegration:
                 print(f"Using existing main folder: {main_folder_name}")
             
             # Check if SKU folder already exists
-            existing_sku_folder_id = self.find_folder_by_name(sku, main_folder_id)
             if existing_sku_folder_id:
                 print(f"SKU folder '{sku}' already exists, using existing folder")
                 sku_folder_id = existing_sku_folder_id
@@ -693,15 +1144,37 @@ class GoogleDriveIntegration:
             
             # Upload all files from local SKU folder (local_sku_folder is already the full path)
             if os.path.exists(local_sku_folder):
-                for filename in os.listdir(local_sku_folder):
-                    file_path = os.path.join(local_sku_folder, filename)
-                    if os.path.isfile(file_path):
-                        file_id = self.upload_file(file_path, sku_folder_id)
+                # scandir entries carry the type and size info, avoiding a stat per file
+                with os.scandir(local_sku_folder) as it:
+                    entries = [entry for entry in it if entry.is_file()]
+                
+                if bundle_mode and entries:
+                    # One upload request instead of one per file
+                    file_id = self._upload_zip_bundle(f"{sku}.zip", [entry.path for entry in entries],
+                                                      sku_folder_id)
+                    if file_id:
+                        uploaded_files.append({
+                            'name': f"{sku}.zip",
+                            'drive_id': file_id,
+                            'local_path': local_sku_folder
+                        })
+                    entries = []
+                
+                def upload_worker(entry):
+                    return self.upload_file(entry.path, sku_folder_id, entry.name,
+                                            service=self._get_thread_drive_service(),
+                                            file_size=entry.stat().st_size)
+                
+                # Upload concurrently; map() keeps results in file order
+                if entries:
+                    file_ids = list(self.upload_executor.map(upload_worker, entries))
+                    
+                    for entry, file_id in zip(entries, file_ids):
                         if file_id:
                             uploaded_files.append({
-                                'name': filename,
+                                'name': entry.name,
                                 'drive_id': file_id,
-                                'local_path': file_path
+                                'local_path': entry.path
                             })
             
             # Create folder structure info
@@ -715,13 +1188,18 @@ class GoogleDriveIntegration:
                 'main_folder_id': main_folder_id
             }
             
-            # Save folder info as JSON
-            folder_info_path = os.path.join(local_sku_folder, f"{sku}_description.json")
-            with open(folder_info_path, 'w', encoding='utf-8') as f:
-                json.dump(folder_info, f, indent=2, ensure_ascii=False)
-            
-            # Upload the folder info file
-            self.upload_file(folder_info_path, sku_folder_id)
+            # Attach folder info to the SKU folder itself; only fall back to a JSON file when it won't fit
+            if not self._set_folder_info(sku_folder_id, folder_info):
+                # Save folder info as JSON
+                folder_info_path = os.path.join(local_sku_folder, f"{sku}_description.json")
+                with open(folder_info_path, 'wb') as f:
+                    if orjson:
+                        f.write(orjson.dumps(folder_info, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+                    else:
+                        f.write(json.dumps(folder_info, indent=2, ensure_ascii=False).encode('utf-8'))
+                
+                # Upload the folder info file
+                self.upload_file(folder_info_path, sku_folder_id)
             
             return {
                 "success": True,
@@ -742,21 +1220,33 @@ class GoogleDriveIntegration:
             return {"success": False, "error": "Google Sheets not authenticated"}
         
         try:
-            # Read CSV data
-            data = []
-            with open(csv_path, 'r', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-                data = list(reader)
-            
-            if not data:
-                return {"success": False, "error": "No data found in CSV"}
-            
             # Use default spreadsheet name if none provided
             if not spreadsheet_name:
                 spreadsheet_name = f"SKU_Inventory"
             
-            # Use smart update method to only add new rows
-            spreadsheet_url = self.smart_update_spreadsheet(spreadsheet_name, data)
+            # Stream CSV rows straight into the smart update instead of loading the whole file
+            with open(csv_path, 'r', newline='', encoding='utf-8') as csvfile:
+                reader = csv.reader(csvfile)
+                headers = next(reader, None)
+                first_row = next((row for row in reader if row), None)
+                if not headers or first_row is None:
+                    return {"success": False, "error": "No data found in CSV"}
+                
+                row_count = 0
+                
+                def csv_rows():
+                    nonlocal row_count
+                    for row in itertools.chain([first_row], reader):
+                        if row:  # Skip blank lines, as DictReader does
+                            row_count += 1
+                            yield row[:len(headers)]
+                
+                # Use smart update method to only add new rows
+                rows = csv_rows()
+                spreadsheet_url = self._smart_append_rows(spreadsheet_name, headers, rows)
+                # It can return before reading every row (e.g. all present), so count the rest too
+                for _ in rows:
+                    pass
             
             if spreadsheet_url:
                 return {
@@ -764,7 +1254,7 @@ class GoogleDriveIntegration:
                     "message": f"CSV synced to Google Sheets successfully",
                     "spreadsheet_url": spreadsheet_url,
                     "spreadsheet_name": spreadsheet_name,
-                    "rows_synced": len(data)
+                    "rows_synced": row_count
                 }
             else:
                 return {"success": False, "error": "Failed to update Google Sheets"}
@@ -782,9 +1272,9 @@ class GoogleDriveIntegration:
             "credentials_path": self.credentials_path,
             "credentials_exist": self.credentials_path is not None and os.path.exists(self.credentials_path),
             "authenticated": self._authenticated,
-            "drive_service_ready": self.drive_service is not None,
-            "sheets_service_ready": self.sheets_service is not None,
-            "gspread_client_ready": self.gspread_client is not None,
+            "drive_service_ready": self._drive_service is not None,
+            "sheets_service_ready": self._sheets_service is not None,
+            "gspread_client_ready": self._gspread_client is not None,
             "status": "dormant" if not self._authenticated else "active"
         }
     
@@ -805,26 +1295,28 @@ def test_google_drive_integration():
     
     # Test with credentials file (if available)
     credentials_path = 'credentials.json'  # User needs to provide this
-    if os.path.exists(credentials_path):
-        integration = GoogleDriveIntegration(credentials_path)
-        print("Google Drive integration initialized successfully!")
-        print("Note: Authentication will only happen when you actually use Google Drive features.")
-        
-        # Show initial status (not authenticated yet)
-        status = integration.get_status()
-        print(f"Initial status: {status}")
-        print("✅ No Google APIs called yet - completely dormant!")
-        
-        # Test the new folder organization functionality
-        print("\nTesting folder organization...")
-        print("All spreadsheets will now be automatically created in the SKU_Generator folder.")
-        print("The system checks the folder first, then creates new spreadsheets there if needed.")
-        print("\n💡 Google Drive will only initialize when you click 'Upload to Google Drive'!")
-        
-        return integration
-    else:
+    try:
+        os.stat(credentials_path)
+    except FileNotFoundError:
         print("No credentials.json found. Please set up Google Drive API credentials.")
         return None
+    
+    integration = GoogleDriveIntegration(credentials_path)
+    print("Google Drive integration initialized successfully!")
+    print("Note: Authentication will only happen when you actually use Google Drive features.")
+    
+    # Show initial status (not authenticated yet)
+    status = integration.get_status()
+    print(f"Initial status: {status}")
+    print("✅ No Google APIs called yet - completely dormant!")
+    
+    # Test the new folder organization functionality
+    print("\nTesting folder organization...")
+    print("All spreadsheets will now be automatically created in the SKU_Generator folder.")
+    print("The system checks the folder first, then creates new spreadsheets there if needed.")
+    print("\n💡 Google Drive will only initialize when you click 'Upload to Google Drive'!")
+    
+    return integration
 
 if __name__ == "__main__":
     test_google_drive_integration()
@@ -3,14 +3,12 @@
 Prompt templates for SKU generation
 """
 
-def get_enhanced_prompt(chinese_context: str = "") -> str:
-    """Get the enhanced prompt template with SKU generation"""
-    return """Analyze these product images and generate a detailed product description in VALID JSON format.
-
-IMPORTANT: You MUST respond with ONLY valid JSON. Do not include any text before or after the JSON.
+import functools
+import json
+import sys
 
-The JSON should have the following structure:
-{{
+# Output fields and the hint the model gets for each; single source of truth for the JSON schema
+SKU_FIELDS = {
     "category": "Category, e.g. bag, watch, shoe...",
     "sub_category": "Sub-category, e.g., handbags, shoulder bags, totes, bags, crossbody bags, satchels, bowling bags, mini bags, others.",
     "brand": "Brand Name",
@@ -30,8 +28,47 @@ The JSON should have the following structure:
     "estimated_price_range": "The price range in GBP for good condition product",
     "urls": ["The source urls for the estimated price range"],
     "recommended_selling_price": "Price in GBP"
-}}
+}
+
+# Skeleton without indentation or padding spaces (fewer input tokens per request)
+_JSON_SKELETON = "{\n" + ",\n".join(
+    json.dumps(name) + ":" + json.dumps(hint, ensure_ascii=False) for name, hint in SKU_FIELDS.items()
+) + "\n}"
+
+# Static part of the prompt (identical for every request, eligible for context caching)
+STATIC_PREFIX = """Analyze these product images and generate a detailed product description in VALID JSON format.
+
+IMPORTANT: You MUST respond with ONLY valid JSON. Do not include any text before or after the JSON.
+
+The JSON should have the following structure:
+""" + _JSON_SKELETON
 
-{chinese_context}
+# Closing instruction appended after the per-request context
+CLOSING_INSTRUCTION = "Please be thorough and accurate in your analysis, and ensure all sources for the estimated price range are provided with working URLs. Respond ONLY with the JSON object."
 
-Please be thorough and accurate in your analysis, and ensure all sources for the estimated price range are provided with working URLs. Respond ONLY with the JSON object."""
+# Fixed pieces around the per-request context, built once at import
+_PROMPT_HEAD = STATIC_PREFIX + "\n\n"
+_PROMPT_TAIL = "\n\n" + CLOSING_INSTRUCTION
+
+
+def dynamic_suffix(chinese_context: str = "") -> str:
+    """Get the per-request part of the prompt that follows STATIC_PREFIX"""
+    return "".join(("\n\n", chinese_context, _PROMPT_TAIL))
+
+
+@functools.lru_cache(maxsize=32)
+def _build_prompt(chinese_context: str) -> str:
+    """Build the full prompt around a non-empty context"""
+    # One join into a single allocation; only the context varies between calls
+    return "".join((_PROMPT_HEAD, chinese_context, _PROMPT_TAIL))
+
+
+# The common no-context prompt, built once
+_DEFAULT_PROMPT = sys.intern(_PROMPT_HEAD + _PROMPT_TAIL)
+
+
+def get_enhanced_prompt(chinese_context: str = "") -> str:
+    """Get the enhanced prompt with SKU generation"""
+    if not chinese_context:
+        return _DEFAULT_PROMPT
+    return _build_prompt(chinese_context)
@@ -3,42 +3,113 @@
 Launcher for Streamlit SKU Generator App (Gemini API only)
 """
 
+import argparse
+import hashlib
+import importlib.util
 import subprocess
 import sys
 import os
+from pathlib import Path
+from typing import Optional
+
+# (pip package, import name) pairs the app needs
+REQUIRED_PACKAGES = [
+    ("streamlit", "streamlit"),
+    ("google-generativeai", "google.generativeai"),
+    ("pillow", "PIL"),
+]
+
+# Bump when REQUIRED_PACKAGES or the marker format changes so existing markers are re-checked
+DEPS_MARKER_VERSION = "2"
+
+def _deps_marker() -> Path:
+    """Marker file recording that this interpreter already has all required packages"""
+    # Not a security use; without the flag md5 raises on FIPS-enabled builds
+    interpreter = hashlib.md5(sys.executable.encode(), usedforsecurity=False).hexdigest()[:8]
+    version = f"{sys.version_info.major}{sys.version_info.minor}"
+    return Path.home() / ".cache" / "sku_generator" / f"deps_ok_{version}_{interpreter}"
+
+def _module_location(module: str) -> Optional[str]:
+    """Where a module is installed, found without importing it (None if it is not installed)"""
+    try:
+        spec = importlib.util.find_spec(module)
+    except ModuleNotFoundError:  # Parent package (e.g. google) is missing
+        return None
+    if spec is None:
+        return None
+    return spec.origin or next(iter(spec.submodule_search_locations or ()), '')
+
+def _find_packages() -> dict:
+    """Map each required pip package to its install location (None when missing)"""
+    return {package: _module_location(module) for package, module in REQUIRED_PACKAGES}
 
 def main():
     """Launch the Streamlit app"""
-    try:
-        # Check if streamlit is installed
-        import streamlit
-        print("✅ Streamlit is installed")
-    except ImportError:
-        print("❌ Streamlit not found. Installing...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "streamlit"])
+    parser = argparse.ArgumentParser(description='Launch the SKU Generator web app')
+    parser.add_argument('--dev', action='store_true',
+                        help='Watch source files and reload on change (development mode)')
+    parser.add_argument('--bootstrap', action='store_true',
+                        help='Install missing packages with pip instead of exiting')
+    args = parser.parse_args()
     
-    # Check if required packages are installed
+    marker = _deps_marker()
     try:
-        import google.generativeai
-        from PIL import Image
-        print("✅ Google Generative AI and PIL are installed")
-    except ImportError:
-        print("❌ Required packages not found. Installing...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "google-generativeai", "pillow"])
+        version, *locations = marker.read_text().splitlines()
+        # A package uninstalled since the last check would otherwise only fail later,
+        # with an ImportError inside streamlit; its recorded location is gone then
+        deps_checked = version == DEPS_MARKER_VERSION and all(map(os.path.exists, locations))
+    except (OSError, ValueError):
+        deps_checked = False
+    
+    if not deps_checked:
+        # Check all required packages; with --bootstrap, install whatever is missing in one pip call
+        locations = _find_packages()
+        missing = [package for package, location in locations.items() if location is None]
+        if missing and not args.bootstrap:
+            print(f"❌ Required packages not found: {', '.join(missing)}")
+            print(f"   Run: pip install {' '.join(missing)}  (or: python run_streamlit.py --bootstrap)")
+            sys.exit(1)
+        if missing:
+            print(f"❌ Required packages not found: {', '.join(missing)}. Installing...")
+            subprocess.check_call([sys.executable, "-m", "pip", "install", *missing])
+            importlib.invalidate_caches()
+            locations = _find_packages()
+        else:
+            print("✅ Streamlit, Google Generative AI and PIL are installed")
+        
+        # Skip the checks on later launches
+        try:
+            marker.parent.mkdir(parents=True, exist_ok=True)
+            marker.write_text("\n".join([DEPS_MARKER_VERSION, *filter(None, locations.values())]))
+        except OSError:
+            pass
     
-    # Launch the app
-    print("🚀 Launching SKU Generator Web App (Gemini API)...")
-    print("📱 Open your browser to the URL shown below")
-    print("🔗 The app will be available at: http://localhost:8501")
-    print("⏹️  Press Ctrl+C to stop the app")
-    print("-" * 50)
+    # Launch the app (banner written in one go)
+    sys.stdout.write(
+        "🚀 Launching SKU Generator Web App (Gemini API)...\n"
+        "📱 Open your browser to the URL shown below\n"
+        "🔗 The app will be available at: http://localhost:8501\n"
+        "⏹️  Press Ctrl+C to stop the app\n"
+        + "-" * 50 + "\n"
+    )
+    sys.stdout.flush()
     
     # Run streamlit
-    subprocess.run([
+    command = [
         sys.executable, "-m", "streamlit", "run", "streamlit_app.py",
         "--server.port", "8501",
-        "--server.address", "localhost"
-    ])
+        "--server.address", "localhost",
+        "--browser.gatherUsageStats", "false"
+    ]
+    if not args.dev:
+        # No browser-opener thread and no recursive file watcher over the working tree
+        command += ["--server.headless", "true", "--server.fileWatcherType", "none"]
+    if os.name == "posix":
+        # Replace this launcher process with streamlit (output was flushed above)
+        os.execvp(command[0], command)
+    else:
+        # Windows exec spawns a detached process, so keep waiting on a child there
+        subprocess.run(command)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
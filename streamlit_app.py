@@ -6,33 +6,121 @@ Web app for generating product descriptions from images using LLM
 
 import streamlit as st
 import os
-import tempfile
-from pathlib import Path
-import base64
-from PIL import Image
+import importlib.util
 import io
 import re
-import shutil
 import csv
 import json
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from generate_sku import SKUGenerator
-from prompts import get_enhanced_prompt
+from operator import itemgetter
 from google_drive_integration import GoogleDriveIntegration, GOOGLE_DRIVE_AVAILABLE
 
+# Optional fast JSON backend (falls back to the stdlib json module)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional C++ CSV parser for full inventory reads (installed alongside streamlit);
+# only located here, imported on the first full inventory read
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+# Optional drag-and-drop reordering (pip install streamlit-sortables)
+try:
+    from streamlit_sortables import sort_items
+except ImportError:
+    sort_items = None
+
 # =============================================================================
 # CONSTANTS AND CONFIGURATION
 # =============================================================================
 
 # CSV field names - defined once to avoid duplication
-CSV_FIELDS = [
+CSV_FIELDS = (
     'SKU', 'Reference_Number', 'Brand', 'Model', 'Material', 'Color', 
     'Size', 'Year_of_Production', 'Category', 'Sub_category', 'Pattern',
     'Condition_Grade', 'Condition_Description', 'Accessories',
     'Retail_Price', 'Recommended_Selling_Price', 'Chinese_Description',
     'Height', 'Width', 'Depth', 'Serial_Number', 'URLs',
     'Image_Count', 'Folder_Path', 'Date_Added', 'Description_File'
-]
+)
+
+# Pulls a full product dict into a CSV_FIELDS-ordered row tuple in one C-level call
+CSV_ROW_GETTER = itemgetter(*CSV_FIELDS)
+
+# Blank row template; copied per product instead of rebuilt from CSV_FIELDS
+EMPTY_PRODUCT_INFO = dict.fromkeys(CSV_FIELDS, '')
+
+# Generated JSON field -> CSV column, built once instead of per description
+JSON_TO_CSV_FIELDS = {
+    'sku': 'SKU',
+    'reference_number': 'Reference_Number',
+    'brand': 'Brand',
+    'model': 'Model',
+    'material': 'Material',
+    'color': 'Color',
+    'size': 'Size',
+    'year_of_production': 'Year_of_Production',
+    'category': 'Category',
+    'sub_category': 'Sub_category',
+    'condition_grade': 'Condition_Grade',
+    'condition_description': 'Condition_Description',
+    'estimated_price_range': 'Retail_Price',
+    'recommended_selling_price': 'Recommended_Selling_Price',
+    'height': 'Height',
+    'width': 'Width',
+    'depth': 'Depth',
+    'serial_number': 'Serial_Number'
+}
+
+# Matches the "SKU: ..." line of a plain-text description
+SKU_LINE_PATTERN = re.compile(r'^SKU:(.*)$', re.MULTILINE)
+
+# Leading magic bytes -> file extension for saved images (WebP is checked separately)
+IMAGE_SIGNATURES = {
+    b'\xff\xd8\xff': '.jpg',
+    b'\x89PNG': '.png',
+    b'BM': '.bmp',
+    b'II': '.tiff',
+    b'MM': '.tiff'
+}
+
+# Columns shown for each product in the sidebar "Recent Entries" list
+RECENT_ENTRY_FIELDS = ('SKU', 'Brand', 'Model', 'Date_Added', 'Image_Count')
+
+# Bounding box for reorder-grid thumbnails (grid cells are ~200px, doubled for HiDPI)
+THUMBNAIL_SIZE = (400, 400)
+
+# Parallel file writes when saving a product (writes release the GIL)
+MAX_WRITE_WORKERS = 4
+
+# One file written by save_to_local_folder (type is 'description' or 'image')
+SavedFile = namedtuple('SavedFile', 'name path type')
+
+# Parsed duplicate-check state for one inventory CSV; tail holds its last bytes to detect rewrites
+InventoryIndex = namedtuple('InventoryIndex', 'mtime_ns size skus refs row_count sku_idx ref_idx tail')
+
+# How many trailing bytes of the CSV are compared before trusting an append-only update
+INVENTORY_TAIL_BYTES = 256
+
+# csv_path -> InventoryIndex; validated with os.stat on each lookup
+_inventory_cache = {}
+
+# Reorder-grid card HTML per state: picked up (elevated), drop target (highlighted), normal
+GRID_CARD_HTML = {
+    state: (
+        f'<div style="border: {border}; border-radius: 12px; padding: 12px; margin: 6px; '
+        f'background-color: {background}; text-align: center; cursor: pointer; box-shadow: {shadow}; '
+        f'transform: {transform}; transition: all 0.3s ease; position: relative;"></div>'
+    )
+    for state, border, background, shadow, transform in (
+        ('selected', '3px solid #4CAF50', '#E8F5E8', '0 8px 16px rgba(0,0,0,0.3)', 'translateY(-5px)'),
+        ('drop_target', '2px dashed #2196F3', '#F0F8FF', '0 2px 8px rgba(33,150,243,0.2)', 'none'),
+        ('normal', '1px solid #ddd', '#FFFFFF', '0 2px 4px rgba(0,0,0,0.1)', 'none')
+    )
+}
 
 # Image type options for user selection
 IMAGE_TYPE_OPTIONS = [
@@ -59,8 +147,24 @@ st.set_page_config(
 def extract_sku_from_description(description) -> str:
     """Extract SKU from the generated description (supports both string and JSON)"""
     if isinstance(description, dict):
-        return description.get('sku') if 'sku' in description else None
-    return None
+        return description.get('sku')
+    return split_description(description)[0]
+
+def split_description(description: str) -> tuple:
+    """Split a plain-text description into (sku, sku_line, content) with a single search"""
+    match = SKU_LINE_PATTERN.search(description)
+    if not match:
+        return None, "", description.strip()
+    content = description[:match.start()] + description[match.end() + 1:]
+    return match.group(1).strip(), match.group(0), content.strip()
+
+@st.cache_resource(show_spinner=False)
+def get_sku_generator(api_key: str, use_response_cache: bool = False):
+    """Return a SKUGenerator shared across reruns for this API key and cache setting"""
+    # Imported on first use: pulls in google-generativeai and PIL
+    from generate_sku import SKUGenerator, DEFAULT_CACHE_PATH
+    cache_path = DEFAULT_CACHE_PATH if use_response_cache else None
+    return SKUGenerator(model_type="gemini", api_key=api_key, cache_path=cache_path)
 
 def get_csv_path(local_folder: str) -> str:
     """Get the path to the CSV file in the local folder"""
@@ -68,29 +172,54 @@ def get_csv_path(local_folder: str) -> str:
 
 def create_csv_if_not_exists(csv_path: str):
     """Create CSV file with headers if it doesn't exist"""
-    if not os.path.exists(csv_path):
-        with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDS)
-            writer.writeheader()
+    # Exclusive create: one open() instead of exists() + open(), and no race between them
+    try:
+        with open(csv_path, 'x', newline='', encoding='utf-8') as csvfile:
+            csv.writer(csvfile).writerow(CSV_FIELDS)
+    except FileExistsError:
+        pass
+
+def write_bytes(path: str, data: bytes):
+    """Write a file in one unbuffered write call"""
+    with open(path, "wb", buffering=0) as f:
+        f.write(data)
 
 def get_file_extension(image_data: bytes) -> str:
     """Determine file extension based on image data"""
-    if image_data.startswith(b'\xff\xd8\xff'):
-        return '.jpg'
-    elif image_data.startswith(b'\x89PNG'):
-        return '.png'
-    elif image_data.startswith(b'BM'):
-        return '.bmp'
-    elif image_data.startswith(b'II') or image_data.startswith(b'MM'):
-        return '.tiff'
-    elif image_data.startswith(b'RIFF') and image_data[8:12] == b'WEBP':
+    # Signatures are 2, 3 or 4 bytes long: one hash lookup per length
+    extension = (IMAGE_SIGNATURES.get(image_data[:4]) or IMAGE_SIGNATURES.get(image_data[:3])
+                 or IMAGE_SIGNATURES.get(image_data[:2]))
+    if extension:
+        return extension
+    if image_data[:4] == b'RIFF' and image_data[8:12] == b'WEBP':
         return '.webp'
-    else:
-        return '.jpg'  # Default to jpg
+    return '.jpg'  # Default to jpg
+
+@st.cache_data(show_spinner=False, max_entries=200)
+def make_thumbnail(image_bytes: bytes) -> bytes:
+    """Downscale an uploaded image to JPEG thumbnail bytes (decoded once per upload)"""
+    from PIL import Image
+    
+    image = Image.open(io.BytesIO(image_bytes))
+    image.draft('RGB', THUMBNAIL_SIZE)
+    image.thumbnail(THUMBNAIL_SIZE)
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=85)
+    return buffer.getvalue()
+
+def get_thumbnail(uploaded_file) -> bytes:
+    """Return the grid thumbnail for an upload, decoding it only the first time it is seen"""
+    key = getattr(uploaded_file, 'file_id', None) or (uploaded_file.name, uploaded_file.size)
+    thumbnail = st.session_state.thumbnails.get(key)
+    if thumbnail is None:
+        thumbnail = st.session_state.thumbnails[key] = make_thumbnail(uploaded_file.getvalue())
+    return thumbnail
 
 def create_empty_product_info() -> dict:
     """Create an empty product info dictionary with all CSV fields"""
-    return {field: '' for field in CSV_FIELDS}
+    return EMPTY_PRODUCT_INFO.copy()
 
 def render_image_type_selector(image_idx: int, uploaded_file) -> str:
     """Render an image type selector for a specific image"""
@@ -123,33 +252,9 @@ def extract_product_info_from_description(description) -> dict:
     info = create_empty_product_info()
     
     if isinstance(description, dict) and 'error' not in description:
-        # Map JSON fields to CSV fields
-        field_mapping = {
-            'sku': 'SKU',
-            'reference_number': 'Reference_Number',
-            'brand': 'Brand',
-            'model': 'Model',
-            'material': 'Material',
-            'color': 'Color',
-            'size': 'Size',
-            'year_of_production': 'Year_of_Production',
-            'category': 'Category',
-            'sub_category': 'Sub_category',
-            'condition_grade': 'Condition_Grade',
-            'condition_description': 'Condition_Description',
-            'estimated_price_range': 'Retail_Price',
-            'recommended_selling_price': 'Recommended_Selling_Price',
-            'height': 'Height',
-            'width': 'Width',
-            'depth': 'Depth',
-            'serial_number': 'Serial_Number'
-        }
-        
-        for json_field, csv_field in field_mapping.items():
+        for json_field, csv_field in JSON_TO_CSV_FIELDS.items():
             value = description.get(json_field, '')
-            if json_field == 'accessories' and isinstance(value, list):
-                value = str(value)
-            elif json_field == 'urls' and isinstance(value, list):
+            if isinstance(value, list):
                 value = str(value)
             info[csv_field] = value
     
@@ -162,13 +267,116 @@ def add_product_to_csv(csv_path: str, product_info: dict, chinese_description: s
     product_info['Chinese_Description'] = chinese_description
     product_info['Image_Count'] = str(image_count)
     product_info['Folder_Path'] = folder_path
-    product_info['Date_Added'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    product_info['Date_Added'] = datetime.now().isoformat(sep=' ', timespec='seconds')
     product_info['Description_File'] = description_file
     
-    # Append to CSV
+    # Append to CSV as a positional row in CSV_FIELDS order
+    row = CSV_ROW_GETTER(product_info)
     with open(csv_path, 'a', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDS)
-        writer.writerow(product_info)
+        csv.writer(csvfile).writerow(row)
+
+def index_inventory_rows(text: str, index: InventoryIndex) -> int:
+    """Add the SKUs and reference numbers in CSV text (no header) to index; return rows read"""
+    row_count = 0
+    for row in csv.reader(io.StringIO(text, newline='')):
+        row_count += 1
+        if 0 <= index.sku_idx < len(row) and row[index.sku_idx]:
+            index.skus.add(row[index.sku_idx])
+        if 0 <= index.ref_idx < len(row):
+            index.refs.add(row[index.ref_idx])
+    return row_count
+
+def index_inventory_table(data: bytes, index: InventoryIndex) -> int:
+    """Add SKUs and reference numbers from a whole CSV file to index using pyarrow; return rows read"""
+    import pyarrow
+    import pyarrow.csv as pyarrow_csv
+    
+    columns = ('SKU', 'Reference_Number')
+    table = pyarrow_csv.read_csv(
+        io.BytesIO(data),
+        parse_options=pyarrow_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pyarrow_csv.ConvertOptions(
+            include_columns=list(columns),
+            column_types={name: pyarrow.string() for name in columns}
+        )
+    )
+    # Blank SKUs are left out, as in index_inventory_rows (the SKU set also drives the product count)
+    index.skus.update(value for value in table.column('SKU').to_pylist() if value)
+    index.refs.update(table.column('Reference_Number').to_pylist())
+    return table.num_rows
+
+def load_inventory_index(csv_path: str) -> tuple:
+    """Return (skus, reference_numbers, row_count) for the CSV, parsing only what changed"""
+    try:
+        stat = os.stat(csv_path)
+    except FileNotFoundError:
+        return set(), set(), 0
+    
+    cached = _inventory_cache.get(csv_path)
+    if cached and (cached.mtime_ns, cached.size) == (stat.st_mtime_ns, stat.st_size):
+        return cached.skus, cached.refs, cached.row_count
+    
+    with open(csv_path, 'rb') as f:
+        # Appended since the last read: parse only the new bytes if the old tail is untouched
+        if cached and stat.st_size > cached.size and cached.tail.endswith(b'\n'):
+            f.seek(cached.size - len(cached.tail))
+            if f.read(len(cached.tail)) == cached.tail:
+                appended = f.read()
+                row_count = cached.row_count + index_inventory_rows(appended.decode('utf-8'), cached)
+                index = cached._replace(mtime_ns=stat.st_mtime_ns, size=cached.size + len(appended),
+                                        row_count=row_count, tail=appended[-INVENTORY_TAIL_BYTES:])
+                _inventory_cache[csv_path] = index
+                return index.skus, index.refs, index.row_count
+            f.seek(0)
+        
+        data = f.read()
+    
+    # Full rebuild: first read, or the file was rewritten rather than appended to
+    header, _, body = data.decode('utf-8-sig').partition('\n')
+    columns = {name: idx for idx, name in enumerate(next(csv.reader([header]), []))}
+    index = InventoryIndex(stat.st_mtime_ns, len(data), set(), set(), 0,
+                           columns.get('SKU', -1), columns.get('Reference_Number', -1),
+                           data[-INVENTORY_TAIL_BYTES:])
+    row_count = None
+    if PYARROW_AVAILABLE and body and index.sku_idx >= 0 and index.ref_idx >= 0:
+        try:
+            row_count = index_inventory_table(data, index)
+        except Exception:
+            # Ragged rows and similar quirks: let the csv module handle them
+            index.skus.clear()
+            index.refs.clear()
+    if row_count is None:
+        row_count = index_inventory_rows(body, index)
+    index = index._replace(row_count=row_count)
+    _inventory_cache[csv_path] = index
+    return index.skus, index.refs, index.row_count
+
+def check_inventory_entry(csv_path: str, product_description: dict) -> tuple:
+    """Return (product_info, error_result); error_result is None when the product can be added"""
+    # Only parsed JSON descriptions carry the fields a CSV row needs; anything else would add a blank row
+    if not isinstance(product_description, dict) or 'error' in product_description:
+        return None, {
+            "success": False,
+            "error": "Description is not structured JSON. Product not added to inventory CSV."
+        }
+    
+    # Check for duplicates against the cached inventory index
+    product_info = extract_product_info_from_description(product_description)
+    sku = product_info['SKU']
+    reference_number = product_info['Reference_Number']
+    existing_skus, existing_refs, _ = load_inventory_index(csv_path)
+    
+    if sku in existing_skus:
+        return product_info, {
+            "success": False,
+            "error": f"SKU {sku} already exists in inventory. Cannot overwrite existing product."
+        }
+    if reference_number in existing_refs:
+        return product_info, {
+            "success": False,
+            "error": f"Reference Number {reference_number} already exists in inventory. Cannot overwrite existing product."
+        }
+    return product_info, None
 
 def auto_update_csv_inventory(local_folder: str, product_description: dict, chinese_description: str, 
                             image_count: int, folder_path: str, description_file: str):
@@ -176,52 +384,41 @@ def auto_update_csv_inventory(local_folder: str, product_description: dict, chin
     csv_path = get_csv_path(local_folder)
     create_csv_if_not_exists(csv_path)
     
-    # Read existing inventory to check for duplicates
-    existing_products = []
-    if os.path.exists(csv_path):
-        with open(csv_path, 'r', newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            existing_products = list(reader)
-    
-    # Check for duplicates
-    sku = product_description.get('sku', '')
-    reference_number = product_description.get('reference_number', '')
-    
-    for product in existing_products:
-        if product.get('SKU') == sku:
-            return {
-                "success": False,
-                "error": f"SKU {sku} already exists in inventory. Cannot overwrite existing product.",
-                "existing_product": product
-            }
-        if product.get('Reference_Number') == reference_number:
-            return {
-                "success": False,
-                "error": f"Reference Number {reference_number} already exists in inventory. Cannot overwrite existing product.",
-                "duplicate_reference": product
-            }
+    product_info, error = check_inventory_entry(csv_path, product_description)
+    if error:
+        return error
     
-    # Extract product information and add to CSV
-    product_info = extract_product_info_from_description(product_description)
+    # Add the extracted product information to CSV
+    product_count = load_inventory_index(csv_path)[2]
     add_product_to_csv(csv_path, product_info, chinese_description, image_count, folder_path, description_file)
     
     return {
         "success": True,
-        "message": f"Product {sku} successfully added to inventory CSV",
+        "message": f"Product {product_info['SKU']} successfully added to inventory CSV",
         "csv_path": csv_path,
-        "total_products": len(existing_products) + 1
+        "total_products": product_count + 1
     }
 
 def get_existing_skus(csv_path: str) -> set:
     """Get all existing SKUs from the CSV file"""
-    existing_skus = set()
-    if os.path.exists(csv_path):
-        with open(csv_path, 'r', newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                if row.get('SKU'):
-                    existing_skus.add(row['SKU'])
-    return existing_skus
+    return load_inventory_index(csv_path)[0]
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def read_inventory_summary(csv_path: str, mtime_ns: int) -> tuple:
+    """Return (product count, last 5 rows) for the sidebar; mtime_ns invalidates the cache"""
+    with open(csv_path, 'r', newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile)
+        columns = {name: idx for idx, name in enumerate(next(reader, []))}
+        # Only the last 5 rows are ever held in memory
+        rows = deque(reader, maxlen=5)
+    
+    recent = []
+    for row in rows:
+        recent.append({
+            field: row[columns[field]] if field in columns and columns[field] < len(row) else 'N/A'
+            for field in RECENT_ENTRY_FIELDS
+        })
+    return len(get_existing_skus(csv_path)), recent
 
 # =============================================================================
 # FILE OPERATIONS
@@ -231,45 +428,48 @@ def save_to_local_folder(sku: str, image_data: list, description: str, output_fi
                         chinese_description: str = "", reference_number: str = "", ordered_images=None):
     """Save files to local folder with SKU-based naming and CSV tracking"""
     try:
+        # Refuse anything the CSV update would reject (duplicate SKU or reference number)
+        # before writing files, so a failed save leaves no orphaned folder behind
+        _, error = check_inventory_entry(get_csv_path(local_folder), description)
+        if error:
+            return error
+        
         # Create folder path (convert SKU to lowercase)
         folder_path = os.path.join(local_folder, sku.lower())
         os.makedirs(folder_path, exist_ok=True)
         
-        saved_files = []
-        
-        # Save description file (convert SKU to lowercase)
+        # Description file (convert SKU to lowercase); written together with the images below
         description_filename = f"{sku.lower()}_description.json"
         description_path = os.path.join(folder_path, description_filename)
         
-        if isinstance(description, dict):
-            with open(description_path, 'w', encoding='utf-8') as f:
-                f.write(json.dumps(description, indent=2, ensure_ascii=False))
+        if isinstance(description, dict) and orjson:
+            description_bytes = orjson.dumps(description, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        elif isinstance(description, dict):
+            description_bytes = json.dumps(description, indent=2, ensure_ascii=False).encode('utf-8')
         else:
-            with open(description_path, 'w', encoding='utf-8') as f:
-                f.write(description)
-        
-        saved_files.append({
-            'name': description_filename,
-            'path': description_path,
-            'type': 'description'
-        })
+            description_bytes = description.encode('utf-8')
         
         # Save images in the correct order
+        image_files = []
         if ordered_images and len(ordered_images) > 0:
             # Create mapping from filename to image data using the current ordered_images
             # This ensures we have the correct data for each image in the current order
             image_data_map = {}
             
-            # Map each ordered image to its corresponding image data
+            # Reuse the extensions detected at generation time when they match the data
+            extensions = st.session_state.get('image_extensions', [])
+            if len(extensions) != len(image_data):
+                extensions = [get_file_extension(data) for data in image_data]
+            
+            # Map each ordered image to its corresponding image data and extension
             for i, ordered_file in enumerate(ordered_images):
                 if i < len(image_data):
-                    image_data_map[ordered_file.name] = image_data[i]
+                    image_data_map[ordered_file.name] = (image_data[i], extensions[i])
             
             # Save images in the order specified by ordered_images
             for i, ordered_file in enumerate(ordered_images, 1):
                 if ordered_file.name in image_data_map:
-                    img_data = image_data_map[ordered_file.name]
-                    file_ext = get_file_extension(img_data)
+                    img_data, file_ext = image_data_map[ordered_file.name]
                     
                     # Get image type for this image using the filename as the key
                     image_type = st.session_state.image_types.get(ordered_file.name, "")
@@ -280,17 +480,15 @@ def save_to_local_folder(sku: str, image_data: list, description: str, output_fi
                     else:
                         new_filename = f"{sku.lower()}_{i}{file_ext}"
                     
-                    new_path = os.path.join(folder_path, new_filename)
-                    
-                    with open(new_path, "wb") as f:
-                        f.write(img_data)
-                    
-                    saved_files.append({
-                        'name': new_filename,
-                        'path': new_path,
-                        'type': 'image'
-                    })
-
+                    image_files.append((new_filename, os.path.join(folder_path, new_filename), img_data))
+        
+        # Write the description and images concurrently; list() re-raises the first write error
+        write_jobs = [(description_path, description_bytes)] + [(path, data) for _, path, data in image_files]
+        with ThreadPoolExecutor(max_workers=min(MAX_WRITE_WORKERS, len(write_jobs))) as executor:
+            list(executor.map(write_bytes, *zip(*write_jobs)))
+        
+        saved_files = [SavedFile(description_filename, description_path, 'description')]
+        saved_files += [SavedFile(name, path, 'image') for name, path, _ in image_files]
         
         # Update CSV inventory
         csv_result = auto_update_csv_inventory(local_folder, description, chinese_description, len(image_data), folder_path, description_filename)
@@ -321,12 +519,13 @@ def initialize_session_state():
     session_vars = {
         'generated_description': "",
         'generated_sku': "",
-        'image_paths': [],
         'image_data': [],
+        'image_extensions': [],
         'show_review': False,
         'ordered_images': [],
         'ordered_images_for_saving': [],
         'image_types': {},  # Store image types for each image
+        'thumbnails': {},  # Thumbnail bytes per upload, so reruns skip hashing full images
         'show_order_info': False,
         'show_preview': False,
         'selected_image_idx': None,
@@ -348,15 +547,15 @@ def initialize_session_state():
 def reset_session_state():
     """Reset all session state variables"""
     reset_vars = [
-        'show_review', 'generated_description', 'generated_sku', 'image_paths', 
-        'image_data', 'ordered_images', 'ordered_images_for_saving', 'uploaded_files',
+        'show_review', 'generated_description', 'generated_sku', 
+        'image_data', 'image_extensions', 'ordered_images', 'ordered_images_for_saving', 'uploaded_files',
         'image_types', 'show_order_info', 'show_preview', 'selected_image_idx', 'confirm_remove_all', 
         'drag_mode'
     ]
     
     for var in reset_vars:
         if var in st.session_state:
-            if var in ['ordered_images', 'ordered_images_for_saving', 'uploaded_files', 'image_paths', 'image_data', 'image_types']:
+            if var in ['ordered_images', 'ordered_images_for_saving', 'uploaded_files', 'image_data', 'image_extensions', 'image_types']:
                 st.session_state[var].clear()
             else:
                 st.session_state[var] = False if var in ['show_review', 'show_order_info', 'show_preview', 'confirm_remove_all', 'drag_mode'] else None
@@ -392,6 +591,13 @@ def render_sidebar():
             placeholder="例如：香奈儿 Le Boy 小号黑色小羊皮包包，成色很好，轻微使用痕迹..."
         )
         
+        # Response cache is opt-in so Generate always asks the model again by default
+        use_response_cache = st.checkbox(
+            "Reuse Cached Responses",
+            value=False,
+            help="Return the stored description for identical images and inputs (kept for 7 days) instead of regenerating"
+        )
+        
         # Local folder save option
         save_to_folder = st.checkbox(
             "Save to Local Folder",
@@ -410,7 +616,10 @@ def render_sidebar():
             
             if local_folder:
                 try:
-                    os.makedirs(local_folder, exist_ok=True)
+                    # Create the folder once per path rather than on every rerun
+                    if st.session_state.get('ready_folder') != local_folder:
+                        os.makedirs(local_folder, exist_ok=True)
+                        st.session_state.ready_folder = local_folder
                     st.success(f"✅ Folder ready: {local_folder}")
                 except Exception as e:
                     st.error(f"❌ Cannot create folder: {str(e)}")
@@ -426,7 +635,7 @@ def render_sidebar():
             render_csv_inventory_section(local_folder)
     
     # Return the configuration values
-    return api_key, reference_number, chinese_description, save_to_folder, local_folder
+    return api_key, reference_number, chinese_description, use_response_cache, save_to_folder, local_folder
 
 def render_google_drive_section():
     """Render the Google Drive integration section"""
@@ -606,14 +815,27 @@ def render_csv_inventory_section(local_folder: str):
     st.markdown("### 📊 Inventory Management")
     
     csv_path = get_csv_path(local_folder)
-    if os.path.exists(csv_path):
+    # One stat answers both "does it exist" and "has it changed"
+    try:
+        csv_mtime_ns = os.stat(csv_path).st_mtime_ns
+    except OSError:
+        csv_mtime_ns = None
+    
+    if csv_mtime_ns is not None:
+        # Parse the CSV only when it changed since the last rerun
+        try:
+            product_count, recent_rows = read_inventory_summary(csv_path, csv_mtime_ns)
+        except Exception as e:
+            st.error(f"Error reading CSV: {str(e)}")
+            return
+        
         # Show inventory stats
-        existing_skus = get_existing_skus(csv_path)
-        st.info(f"📈 **Inventory Status:** {len(existing_skus)} products tracked")
+        st.info(f"📈 **Inventory Status:** {product_count} products tracked")
         
         # Download CSV button
         if st.button("📥 Download Inventory CSV"):
-            with open(csv_path, 'r', encoding='utf-8') as f:
+            # Read only on click, as raw bytes (no decode and re-encode)
+            with open(csv_path, 'rb') as f:
                 csv_data = f.read()
             st.download_button(
                 label="💾 Download CSV File",
@@ -624,21 +846,14 @@ def render_csv_inventory_section(local_folder: str):
         
         # Show recent entries
         if st.checkbox("👁️ Show Recent Entries"):
-            try:
-                with open(csv_path, 'r', newline='', encoding='utf-8') as csvfile:
-                    reader = csv.DictReader(csvfile)
-                    rows = list(reader)
-                    
-                    if rows:
-                        st.markdown("**📋 Recent Products:**")
-                        # Show last 5 entries
-                        for i, row in enumerate(rows[-5:], 1):
-                            st.markdown(f"**{i}.** {row.get('SKU', 'N/A')} - {row.get('Brand', 'N/A')} {row.get('Model', 'N/A')}")
-                            st.markdown(f"   📅 {row.get('Date_Added', 'N/A')} | 📸 {row.get('Image_Count', 'N/A')} images")
-                    else:
-                        st.info("No products in inventory yet.")
-            except Exception as e:
-                st.error(f"Error reading CSV: {str(e)}")
+            if recent_rows:
+                st.markdown("**📋 Recent Products:**")
+                # Show last 5 entries
+                for i, row in enumerate(recent_rows, 1):
+                    st.markdown(f"**{i}.** {row['SKU']} - {row['Brand']} {row['Model']}")
+                    st.markdown(f"   📅 {row['Date_Added']} | 📸 {row['Image_Count']} images")
+            else:
+                st.info("No products in inventory yet.")
     else:
         st.info("📊 Inventory CSV will be created when you save your first product.")
 
@@ -653,7 +868,7 @@ def main():
     initialize_session_state()
     
     # Get sidebar configuration
-    api_key, reference_number, chinese_description, save_to_folder, local_folder = render_sidebar()
+    api_key, reference_number, chinese_description, use_response_cache, save_to_folder, local_folder = render_sidebar()
     
     # Main content area
     col1, col2 = st.columns([1, 1])
@@ -680,6 +895,7 @@ def main():
                     st.session_state.ordered_images.clear()
                     st.session_state.uploaded_files.clear()
                     st.session_state.image_types.clear()
+                    st.session_state.thumbnails.clear()
                     st.session_state.selected_image_idx = None
                     st.session_state.confirm_remove_all = False
                     st.session_state.drag_mode = False
@@ -701,11 +917,24 @@ def main():
             st.subheader("🖼️ Image Grid & Reordering")
             # Image Grid Display - Drag & Drop Simulation
             st.markdown("**🖼️ Image Grid (4 per row) - Drag & Drop Style Interface**")
-            st.markdown("""
-            **How to use (simulates drag & drop):**
-            - **🎯 Pick Up**: Click image to select (gets elevated with shadow)
-            - **📥 Drop**: Click destination to move image there
-            """)
+            # The Pick Up / Drop buttons only exist without the drag-and-drop list
+            if sort_items is None:
+                st.markdown("""
+                **How to use (simulates drag & drop):**
+                - **🎯 Pick Up**: Click image to select (gets elevated with shadow)
+                - **📥 Drop**: Click destination to move image there
+                """)
+            
+            # One drag-and-drop list reorders everything in a single rerun when available
+            if sort_items is not None:
+                current_names = [f.name for f in st.session_state.ordered_images]
+                files_by_name = {f.name: f for f in st.session_state.ordered_images}
+                if len(files_by_name) == len(current_names):
+                    sorted_names = sort_items(current_names, key=f"sortable_{uploader_key}")
+                    # The component can return stale order after an upload is removed or replaced
+                    if sorted_names != current_names and set(sorted_names) == set(current_names):
+                        st.session_state.ordered_images = [files_by_name[name] for name in sorted_names]
+                        st.session_state.selected_image_idx = None
             
             # Initialize interaction state
             if 'selected_image_idx' not in st.session_state:
@@ -750,45 +979,17 @@ def main():
                             is_selected = st.session_state.selected_image_idx == image_idx
                             is_drag_mode = st.session_state.drag_mode
                             
-                            # Determine styling based on state
+                            # Styled card header for the current drag & drop state (HTML prebuilt once)
                             if is_selected:
-                                # Picked up image - elevated appearance
-                                border_color = "3px solid #4CAF50"
-                                background_color = "#E8F5E8"
-                                shadow = "0 8px 16px rgba(0,0,0,0.3)"
-                                transform = "translateY(-5px)"
-                            elif is_drag_mode and not is_selected:
-                                # Drop target - subtle highlight
-                                border_color = "2px dashed #2196F3"
-                                background_color = "#F0F8FF"
-                                shadow = "0 2px 8px rgba(33,150,243,0.2)"
-                                transform = "none"
+                                card_state = 'selected'
+                            elif is_drag_mode:
+                                card_state = 'drop_target'
                             else:
-                                # Normal state
-                                border_color = "1px solid #ddd"
-                                background_color = "#FFFFFF"
-                                shadow = "0 2px 4px rgba(0,0,0,0.1)"
-                                transform = "none"
+                                card_state = 'normal'
+                            st.markdown(GRID_CARD_HTML[card_state], unsafe_allow_html=True)
                             
-                            # Create enhanced container with drag & drop styling
-                            st.markdown(f"""
-                            <div style="
-                                border: {border_color};
-                                border-radius: 12px;
-                                padding: 12px;
-                                margin: 6px;
-                                background-color: {background_color};
-                                text-align: center;
-                                cursor: pointer;
-                                box-shadow: {shadow};
-                                transform: {transform};
-                                transition: all 0.3s ease;
-                                position: relative;
-                            ">
-                            """, unsafe_allow_html=True)
-                            
-                            # Display image with enhanced caption
-                            image = Image.open(uploaded_file)
+                            # Display a cached thumbnail with enhanced caption
+                            image = get_thumbnail(uploaded_file)
                             caption_text = f"**{image_idx + 1}.** {uploaded_file.name[:20]}{'...' if len(uploaded_file.name) > 20 else ''}"
                             
                             if is_selected:
@@ -805,8 +1006,8 @@ def main():
                             # Image type selector
                             image_type = render_image_type_selector(image_idx, uploaded_file)
                             
-                            # Action button integrated into image
-                            if st.button(f"{'📥 Drop Here' if is_drag_mode and not is_selected else '🎯 Pick Up' if not is_selected else '🔄 Put Down'}", 
+                            # Action button integrated into image (click-based fallback without sortables)
+                            if sort_items is None and st.button(f"{'📥 Drop Here' if is_drag_mode and not is_selected else '🎯 Pick Up' if not is_selected else '🔄 Put Down'}", 
                                         key=f"action_{image_idx}", 
                                         help=f"{'Drop selected image here' if is_drag_mode and not is_selected else 'Select this image' if not is_selected else 'Deselect this image'}"):
                                 
@@ -832,7 +1033,6 @@ def main():
                                     # Clear selection
                                     st.session_state.selected_image_idx = None
                                     # Don't rerun - let the page refresh naturally
-                            st.markdown("</div>", unsafe_allow_html=True)
     
     with col2:
         st.header("⚙️ Generation")
@@ -846,53 +1046,41 @@ def main():
             
             try:
                 with st.spinner("Processing images with AI..."):
-                    # Create temporary directory for images
-                    with tempfile.TemporaryDirectory() as temp_dir:
-                        # Save uploaded files to temp directory using ordered images
-                        image_paths = []
-                        image_data = [] # Store image data in session state
-                        for uploaded_file in st.session_state.ordered_images:
-                            temp_path = os.path.join(temp_dir, uploaded_file.name)
-                            with open(temp_path, "wb") as f:
-                                f.write(uploaded_file.getbuffer())
-                            image_paths.append(temp_path)
-                            # Read image data and store in session state
-                            image_data.append(uploaded_file.getvalue())
-                        
-                        # Store image paths and data in session state for later use
-                        st.session_state.image_paths = image_paths
-                        st.session_state.image_data = image_data
-                        
-                        # Also store the ordered files for reference in saving
-                        st.session_state.ordered_images_for_saving = list(st.session_state.ordered_images)
-                        
-                        # Initialize SKU Generator
-                        generator = SKUGenerator(model_type="gemini", api_key=api_key)
-                        
-                        # Create enhanced prompt with Chinese description
-                        chinese_context = ""
-                        if chinese_description:
-                            chinese_context = f"""
+                    # Read each upload once; the bytes feed both generation and saving
+                    image_data = [uploaded_file.getvalue() for uploaded_file in st.session_state.ordered_images]
+                    image_names = [uploaded_file.name for uploaded_file in st.session_state.ordered_images]
+                    st.session_state.image_data = image_data
+                    st.session_state.image_extensions = [get_file_extension(data) for data in image_data]
+                    
+                    # Also store the ordered files for reference in saving
+                    st.session_state.ordered_images_for_saving = list(st.session_state.ordered_images)
+                    
+                    # Reuse the SKU Generator (model, context cache, response cache) for this key
+                    generator = get_sku_generator(api_key, use_response_cache)
+                    
+                    # Create enhanced prompt with Chinese description
+                    chinese_context = ""
+                    if chinese_description:
+                        chinese_context = f"""
 
 CHINESE DESCRIPTION PROVIDED:
 {chinese_description}
 
 Please use this Chinese description to enhance your analysis and provide more accurate details about the bag type, condition, and specifications."""
-                        
-                        # Process with default enhanced prompt
-                        formatted_prompt = get_enhanced_prompt().format(
-                            chinese_context=chinese_context
-                        )
-                        description = generator.process_with_gemini_enhanced(image_paths, reference_number, chinese_context, formatted_prompt)
-                        
-                        # Store generated description in session state
-                        st.session_state.generated_description = description
-                        st.session_state.generated_sku = extract_sku_from_description(description)
-                        st.session_state.show_review = True
-                        
-                        st.success("✅ Description generated successfully!")
-                        st.rerun()
-                        
+                    
+                    # Process with default enhanced prompt
+                    description = generator.process_with_gemini_enhanced(
+                        image_names, reference_number, chinese_context, image_data=image_data
+                    )
+                    
+                    # Store generated description in session state
+                    st.session_state.generated_description = description
+                    st.session_state.generated_sku = extract_sku_from_description(description)
+                    st.session_state.show_review = True
+                    
+                    st.success("✅ Description generated successfully!")
+                    st.rerun()
+                    
             except Exception as e:
                 st.error(f"❌ Error generating description: {str(e)}")
                 st.exception(e)
@@ -960,15 +1148,7 @@ Please use this Chinese description to enhance your analysis and provide more ac
                     edited_description = st.session_state.generated_description
                 
             else:
-                lines = st.session_state.generated_description.split('\n')
-                sku_line = ""
-                description_content = []
-                
-                for line in lines:
-                    if line.startswith("SKU:"):
-                        sku_line = line
-                    else:
-                        description_content.append(line)
+                _, sku_line, content_text = split_description(st.session_state.generated_description)
                 
                 # Display SKU line as read-only
                 st.text_input(
@@ -979,7 +1159,6 @@ Please use this Chinese description to enhance your analysis and provide more ac
                 )
                 
                 # Editable text area for the description content only
-                content_text = '\n'.join(description_content).strip()
                 edited_content = st.text_area(
                     "Edit Product Description (SKU excluded)",
                     value=content_text,
@@ -1034,10 +1213,10 @@ Please use this Chinese description to enhance your analysis and provide more ac
                                 st.info(f"📁 Folder: {save_result['folder_path']}")
                                 st.info(f"📄 Files saved: {save_result['total_files']}")
                                 for file in save_result['saved_files']:
-                                    if file['type'] == 'image':
-                                        st.info(f"📸 Image: {file['name']}")
-                                    elif file['type'] == 'description':
-                                        st.info(f"📄 Description: {file['name']}")
+                                    if file.type == 'image':
+                                        st.info(f"📸 Image: {file.name}")
+                                    elif file.type == 'description':
+                                        st.info(f"📄 Description: {file.name}")
                                 
                                 # CSV tracking confirmation
                                 if save_result.get("csv_updated"):
@@ -1059,24 +1238,11 @@ Please use this Chinese description to enhance your analysis and provide more ac
                                         else:
                                             st.markdown(f"   {i}. {ordered_file.name}")
                                 
-                                # Show folder structure with image types
-                                structure_lines = [f"{save_result['folder_name']}/"]
-                                structure_lines.append(f"├── {current_sku.lower()}_description.json")
-                                
-                                for i, ordered_file in enumerate(st.session_state.ordered_images, 1):
-                                    # Get image type and extension using filename-based lookup
-                                    image_type = st.session_state.image_types.get(ordered_file.name, "")
-                                    file_ext = get_file_extension(st.session_state.image_data[i-1])
-                                    
-                                    if image_type:
-                                        filename = f"{current_sku.lower()}_{i}_{image_type.lower()}{file_ext}"
-                                    else:
-                                        filename = f"{current_sku.lower()}_{i}{file_ext}"
-                                    
-                                    if i == len(st.session_state.ordered_images):
-                                        structure_lines.append(f"└── {filename}")
-                                    else:
-                                        structure_lines.append(f"├── {filename}")
+                                # Show folder structure using the image filenames that were actually written
+                                image_filenames = [file.name for file in save_result['saved_files'] if file.type == 'image']
+                                structure_lines = [f"{save_result['folder_name']}/", f"├── {current_sku.lower()}_description.json"]
+                                structure_lines += [f"├── {filename}" for filename in image_filenames[:-1]]
+                                structure_lines += [f"└── {filename}" for filename in image_filenames[-1:]]
                                 
                                 st.markdown("**📁 Folder Structure:**")
                                 st.code('\n'.join(structure_lines))